@@ -0,0 +1,197 @@
+import argparse
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from crossword import Crossword
+from generate import MODES, PortfolioCrosswordCreator, SolveStats
+from grids import generate_dictionary, generate_grid, write_structure, write_words
+
+# Words file whose letter pairs the synthetic dictionaries imitate
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "data", "words2.txt")
+
+# Benchmark configurations: (grid size, black squares, dictionary words)
+CONFIGS = [
+    (4, 0, 3000),
+    (5, 2, 5000),
+    (5, 4, 2000),
+    (6, 6, 3000),
+    (7, 12, 20000),
+    (9, 20, 50000),
+    (11, 30, 100000),
+    (15, 42, 200000),
+]
+
+# Time allowed for the traced run, relative to the budget, as tracing
+# memory slows allocation-heavy solvers down
+TRACE_ALLOWANCE = 3
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark generate.py solver modes on generated grids "
+                    "and synthetic dictionaries."
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=10,
+                        help="seconds allowed per solver run")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES),
+                        default=list(MODES), help="solver modes to compare")
+    args = parser.parse_args()
+
+    header = (f"{'size':>4} {'blk':>3} {'words':>6} {'vars':>4}  "
+              f"{'mode':<10} {'result':<8} {'time (s)':>9} {'nodes':>8} "
+              f"{'peak KiB':>9}")
+    print(header)
+    print("-" * len(header))
+    for row in run_benchmark(CONFIGS, args.modes, args.seed, args.budget):
+        nodes = "n/a" if row["nodes"] is None else row["nodes"]
+        memory = ("n/a" if row["memory"] is None
+                  else f"{row['memory'] / 1024:.1f}")
+        print(f"{row['size']:>4} {row['blacks']:>3} {row['words']:>6} "
+              f"{row['variables']:>4}  {row['mode']:<10} {row['result']:<8} "
+              f"{row['time']:>9.3f} {nodes:>8} {memory:>9}", flush=True)
+
+
+def run_benchmark(configs, modes, seed=1, budget=10):
+    """
+    Run every solver mode in `modes` on a grid and dictionary generated for
+    each configuration, with the same `seed` for every configuration. The
+    solvers also run with `seed` as their hash seed, since the order in
+    which set-based domains are searched follows it.
+
+    Return a list of result rows recording whether a solution was found
+    ("solved"), none exists ("none") or the `budget` in seconds ran out
+    ("timeout"), the time to the first solution, the nodes explored and the
+    peak memory allocated while solving. Nodes and memory are None when
+    unknown.
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        with open(SOURCE) as f:
+            source = f.read().splitlines()
+        for size, blacks, count in configs:
+            structure_file = os.path.join(directory, f"structure{size}.txt")
+            words_file = os.path.join(directory, f"words{size}.txt")
+            with open(structure_file, "w") as f:
+                write_structure(generate_grid(size, blacks, seed=seed), f)
+            with open(words_file, "w") as f:
+                write_words(generate_dictionary(
+                    count, lengths=(3, size), source=source, seed=seed
+                ), f)
+            crossword = Crossword(structure_file, words_file)
+            row = {
+                "size": size,
+                "blacks": blacks,
+                "words": len(crossword.words),
+                "variables": len(crossword.variables),
+            }
+            for mode in modes:
+                rows.append(dict(row, mode=mode, **measure(
+                    mode, structure_file, words_file, budget, seed
+                )))
+    return rows
+
+
+def measure(mode, structure_file, words_file, budget, seed=1):
+    """
+    Solve a crossword with `mode` in a child process, so that a run can be
+    stopped once it exceeds `budget` seconds, and return a dict with its
+    result, elapsed time, nodes and peak memory.
+
+    The peak memory comes from a second, untimed run under tracemalloc,
+    which is allowed longer as tracing slows allocation down. For the
+    portfolio it covers the coordinating process only.
+    """
+    result = run_child(mode, structure_file, words_file, budget, False,
+                       seed)
+    if result is None:
+        return {"result": "timeout", "time": budget, "nodes": None,
+                "memory": None}
+    traced = run_child(mode, structure_file, words_file,
+                       budget * TRACE_ALLOWANCE, True, seed)
+    result["memory"] = None if traced is None else traced["memory"]
+    return result
+
+
+def run_child(mode, structure_file, words_file, budget, trace, seed=1):
+    """
+    Run `solve_crossword` in a child interpreter started with `seed` as its
+    hash seed, and return its result, or None if it did not finish within
+    `budget` seconds.
+
+    The hash seed fixes the order in which set-based domains are searched,
+    and can only be chosen when an interpreter starts, so the child gets it
+    in a copy of the environment.
+    """
+    child = subprocess.Popen(
+        [sys.executable, "-c", "import benchmark; benchmark.child()"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    task = (mode, structure_file, words_file, budget, trace)
+    try:
+        output, _ = child.communicate(pickle.dumps(task), timeout=budget)
+    except subprocess.TimeoutExpired:
+        child.terminate()
+        child.communicate()
+        return None
+    if child.returncode != 0:
+        raise RuntimeError(f"{mode} solver exited with {child.returncode}")
+    return pickle.loads(output)
+
+
+def child():
+    """
+    Run `solve_crossword` on the task pickled on standard input, and write
+    the pickled result to standard output.
+    """
+    # Exit cleanly when terminated, so that a portfolio shuts its pool down
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    task = pickle.load(sys.stdin.buffer)
+    result = solve_crossword(*task)
+    pickle.dump(result, sys.stdout.buffer)
+
+
+def solve_crossword(mode, structure_file, words_file, budget, trace):
+    """
+    Solve a crossword with `mode` and return a dict with the result, the
+    elapsed time, the nodes explored and, when tracing, the peak memory.
+    """
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    crossword = Crossword(structure_file, words_file)
+    if mode == "portfolio":
+        creator = PortfolioCrosswordCreator(crossword, budget=budget)
+    else:
+        creator = MODES[mode](crossword)
+        creator.stats = SolveStats()
+    assignment = creator.solve()
+    elapsed = time.perf_counter() - start
+
+    if mode == "portfolio":
+        nodes = sum(report["nodes"] for report in creator.reports)
+        stopped = all(report["status"] == "stopped"
+                      for report in creator.reports)
+    else:
+        nodes = creator.stats.nodes
+        stopped = getattr(creator, "stopped", False)
+    if assignment is not None:
+        result = "solved"
+    else:
+        result = "timeout" if stopped else "none"
+    memory = tracemalloc.get_traced_memory()[1] if trace else None
+    return {"result": result, "time": elapsed, "nodes": nodes,
+            "memory": memory}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,49 @@
+import mmap
+import struct
+
+
 class Variable():
 
     ACROSS = "across"
     DOWN = "down"
 
+    __slots__ = ("i", "j", "direction", "length", "cells", "_hash")
+
     def __init__(self, i, j, direction, length):
         """Create a new variable with starting point, direction, and length."""
         self.i = i
         self.j = j
         self.direction = direction
         self.length = length
-        self.cells = []
-        for k in range(self.length):
-            self.cells.append(
-                (self.i + (k if self.direction == Variable.DOWN else 0),
-                 self.j + (k if self.direction == Variable.ACROSS else 0))
-            )
+        self.cells = tuple(
+            (self.i + (k if self.direction == Variable.DOWN else 0),
+             self.j + (k if self.direction == Variable.ACROSS else 0))
+            for k in range(self.length)
+        )
+        # Hash the direction as a bool: string hashes vary between runs,
+        # which would make the iteration order of variable sets vary too
+        self._hash = hash((self.i, self.j,
+                           self.direction == Variable.ACROSS, self.length))
 
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self._hash
 
     def __eq__(self, other):
-        return (
+        return self is other or (
+            isinstance(other, Variable) and
             (self.i == other.i) and
             (self.j == other.j) and
             (self.direction == other.direction) and
             (self.length == other.length)
         )
 
+    def __lt__(self, other):
+        return ((self.i, self.j, self.direction) <
+                (other.i, other.j, other.direction))
+
+    def __reduce__(self):
+        return (Variable, (self.i, self.j, self.direction, self.length))
+
     def __str__(self):
         return f"({self.i}, {self.j}) {self.direction} : {self.length}"
 
@@ -35,9 +52,24 @@ class Variable():
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class Overlaps(dict):
+    """
+    Overlaps between pairs of variables. Only overlapping pairs are stored;
+    looking up any other pair gives None.
+    """
+
+    def __missing__(self, key):
+        return None
+
+
 class Crossword():
 
     def __init__(self, structure_file, words_file):
+        """
+        Load a structure and a vocabulary, which is either a text file
+        with one word per line or a vocabulary compiled by
+        `compile_vocabulary`.
+        """
 
         # Determine structure of crossword
         with open(structure_file) as f:
@@ -57,9 +89,14 @@ class Crossword():
                         row.append(False)
                 self.structure.append(row)
 
-        # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # Save vocabulary list, or map a compiled vocabulary
+        self.index = None
+        self._words = None
+        if is_compiled_vocabulary(words_file):
+            self.index = CompiledWordIndex(words_file)
+        else:
+            with open(words_file) as f:
+                self._words = set(f.read().upper().splitlines())
 
         # Determine variable set
         self.variables = set()
@@ -108,26 +145,269 @@ class Crossword():
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Each cell belongs to at most one across and one down variable,
+        # so overlaps are found by mapping cells to variables.
+        cell_variables = dict()
+        for v in self.variables:
+            for k, cell in enumerate(v.cells):
+                cell_variables.setdefault(cell, []).append((v, k))
+        self.overlaps = Overlaps()
+        neighbors = {v: [] for v in self.variables}
+        for pair in cell_variables.values():
+            if len(pair) == 2:
+                (v1, k1), (v2, k2) = pair
+                self.overlaps[v1, v2] = (k1, k2)
+                self.overlaps[v2, v1] = (k2, k1)
+                neighbors[v1].append(v2)
+                neighbors[v2].append(v1)
+        self.neighbor_map = {
+            v: tuple(sorted(neighbors[v])) for v in self.variables
+        }
 
     def neighbors(self, var):
-        """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        """Given a variable, return a tuple of overlapping variables."""
+        return self.neighbor_map[var]
+
+    @property
+    def words(self):
+        """The set of words in the vocabulary."""
+        if self._words is None:
+            self._words = {
+                word
+                for length in self.index.lengths()
+                for word in self.index.word_list(length)
+            }
+        return self._words
+
+    def word_index(self):
+        """Return a WordIndex of the vocabulary, built on first use."""
+        if self.index is None:
+            self.index = WordIndex(self.words)
+        return self.index
+
+
+# Positions of the set bits in each byte value, for decoding bitsets
+BYTE_BITS = [
+    tuple(k for k in range(8) if byte >> k & 1)
+    for byte in range(256)
+]
+
+
+class WordIndex():
+    """
+    Vocabulary indexed by word length and by letter position.
+
+    Words of each length are numbered 0, 1, ... in sorted order, so a set
+    of words of one length can be stored as a bitset (an int whose bit k is
+    set when word k is in the set). For every length, position and letter,
+    the index holds the bitset of words with that letter at that position,
+    built on first use.
+    """
+
+    def __init__(self, words):
+        self.words = dict()
+        for word in sorted(words):
+            self.words.setdefault(len(word), []).append(word)
+        self.ids = dict()
+        self.masks = dict()
+
+    def lengths(self):
+        """Return the set of word lengths in the vocabulary."""
+        return set(self.words)
+
+    def count(self, length):
+        """Return the number of words of length `length`."""
+        return len(self.word_list(length))
+
+    def full(self, length):
+        """Return the bitset of all words of length `length`."""
+        return (1 << self.count(length)) - 1
+
+    def word_list(self, length):
+        """Return the sorted list of words of length `length`."""
+        return self.words.get(length, ())
+
+    def id(self, word):
+        """Return the number of `word` among words of its length."""
+        length = len(word)
+        if length not in self.ids:
+            self.ids[length] = {
+                w: k for k, w in enumerate(self.word_list(length))
+            }
+        return self.ids[length][word]
+
+    def position_masks(self, length, position):
+        """
+        Return a dict mapping each letter to the bitset of words of length
+        `length` with that letter at `position`.
+        """
+        if length not in self.masks:
+            self.masks[length] = self.build_masks(length)
+        return self.masks[length][position]
+
+    def letter_mask(self, length, position, letter):
+        """
+        Return the bitset of words of length `length` with `letter` at
+        `position`.
+        """
+        return self.position_masks(length, position).get(letter, 0)
+
+    def build_masks(self, length):
+        """Compute the letter bitsets for every position of one length."""
+        words = self.word_list(length)
+        size = (len(words) + 7) // 8
+        positions = []
+        for position in range(length):
+            buffers = dict()
+            for k, word in enumerate(words):
+                letter = word[position]
+                if letter not in buffers:
+                    buffers[letter] = bytearray(size)
+                buffers[letter][k >> 3] |= 1 << (k & 7)
+            positions.append({
+                letter: int.from_bytes(buffer, "little")
+                for letter, buffer in buffers.items()
+            })
+        return positions
+
+    def decode(self, length, bits):
+        """Return the list of words of length `length` in bitset `bits`."""
+        words = self.word_list(length)
+        result = []
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for i, byte in enumerate(data):
+            if byte:
+                for k in BYTE_BITS[byte]:
+                    result.append(words[8 * i + k])
+        return result
+
+
+# Compiled vocabulary file layout, all little-endian: a header holding the
+# magic bytes and the number of word lengths, a table with one entry per
+# length, and for each length its words, sorted and packed as ASCII, then
+# for each position the number of distinct letters there followed, for
+# each letter, by its code and the bitset of words with it at the position
+VOCABULARY_MAGIC = b"CWVOCAB1"
+VOCABULARY_HEADER = struct.Struct("<8sI")
+VOCABULARY_ENTRY = struct.Struct("<IIQQ")
+VOCABULARY_LETTERS = struct.Struct("<H")
+VOCABULARY_LETTER = struct.Struct("<B")
+
+
+def compile_vocabulary(words_file, vocabulary_file):
+    """
+    Compile the words in text file `words_file` into `vocabulary_file`, a
+    memory-mappable file holding the words bucketed by length together
+    with their letter-position bitsets. Return the number of words.
+    """
+    with open(words_file) as f:
+        words = set(f.read().upper().splitlines())
+    if not all(word.isascii() for word in words):
+        raise ValueError("compiled vocabularies hold ASCII words only")
+    index = WordIndex(words)
+    lengths = sorted(index.lengths())
+
+    sections = []
+    offset = VOCABULARY_HEADER.size + VOCABULARY_ENTRY.size * len(lengths)
+    entries = []
+    for length in lengths:
+        words = index.word_list(length)
+        size = (len(words) + 7) // 8
+        packed = "".join(words).encode("ascii")
+        masks = bytearray()
+        for letters in index.build_masks(length):
+            masks += VOCABULARY_LETTERS.pack(len(letters))
+            for letter in sorted(letters):
+                masks += VOCABULARY_LETTER.pack(ord(letter))
+                masks += letters[letter].to_bytes(size, "little")
+        entries.append(VOCABULARY_ENTRY.pack(
+            length, len(words), offset, offset + len(packed)
+        ))
+        sections.extend([packed, masks])
+        offset += len(packed) + len(masks)
+
+    with open(vocabulary_file, "wb") as f:
+        f.write(VOCABULARY_HEADER.pack(VOCABULARY_MAGIC, len(lengths)))
+        f.writelines(entries)
+        f.writelines(sections)
+    return sum(index.count(length) for length in lengths)
+
+
+def is_compiled_vocabulary(filename):
+    """Return True if `filename` is a compiled vocabulary."""
+    with open(filename, "rb") as f:
+        return f.read(len(VOCABULARY_MAGIC)) == VOCABULARY_MAGIC
+
+
+class CompiledWordIndex(WordIndex):
+    """
+    WordIndex backed by a memory-mapped compiled vocabulary.
+
+    Opening one only reads the table of word lengths. The words and the
+    letter bitsets of a length are read from the mapping the first time
+    that length is used, so loading takes milliseconds however large the
+    vocabulary is, and the pages are shared between processes.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = VOCABULARY_HEADER.unpack_from(self.data)
+        if magic != VOCABULARY_MAGIC:
+            raise ValueError(f"{filename} is not a compiled vocabulary")
+        self.table = dict()
+        for k in range(count):
+            length, words, words_offset, masks_offset = \
+                VOCABULARY_ENTRY.unpack_from(
+                    self.data,
+                    VOCABULARY_HEADER.size + k * VOCABULARY_ENTRY.size
+                )
+            self.table[length] = (words, words_offset, masks_offset)
+        self.words = dict()
+        self.ids = dict()
+        self.masks = dict()
+
+    def __reduce__(self):
+        return (CompiledWordIndex, (self.filename,))
+
+    def lengths(self):
+        """Return the set of word lengths in the vocabulary."""
+        return set(self.table)
+
+    def count(self, length):
+        """Return the number of words of length `length`."""
+        return self.table[length][0] if length in self.table else 0
+
+    def word_list(self, length):
+        """Return the sorted list of words of length `length`."""
+        if length not in self.words:
+            if length not in self.table:
+                return ()
+            count, start, _ = self.table[length]
+            packed = self.data[start:start + count * length].decode("ascii")
+            self.words[length] = [
+                packed[k:k + length] for k in range(0, len(packed), length)
+            ] if length else [""] * count
+        return self.words[length]
+
+    def build_masks(self, length):
+        """Read the letter bitsets for every position of one length."""
+        if length not in self.table:
+            return [dict() for _ in range(length)]
+        count, _, offset = self.table[length]
+        size = (count + 7) // 8
+        positions = []
+        for position in range(length):
+            letters, = VOCABULARY_LETTERS.unpack_from(self.data, offset)
+            offset += VOCABULARY_LETTERS.size
+            masks = dict()
+            for _ in range(letters):
+                code, = VOCABULARY_LETTER.unpack_from(self.data, offset)
+                offset += VOCABULARY_LETTER.size
+                masks[chr(code)] = int.from_bytes(
+                    self.data[offset:offset + size], "little"
+                )
+                offset += size
+            positions.append(masks)
+        return positions
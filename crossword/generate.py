@@ -1,10 +1,40 @@
+import argparse
+import multiprocessing
+import os
+import random
 import sys
-import copy
+import time
+from collections import deque
 from crossword import *
 
 
+class SolveStats():
+    """
+    Counters collected on the hot path of a search. `backtracks` counts
+    assignments retracted after failing, and `pruned` the words skipped
+    for leaving a solution too close to one already found.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.pruned = 0
+        self.wipeouts = 0
+        self.solutions = 0
+        self.propagation_time = 0.0
+
+    def __str__(self):
+        return (f"{self.nodes} nodes, {self.backtracks} backtracks, "
+                f"{self.pruned} pruned, "
+                f"{self.wipeouts} wipeouts, {self.solutions} solutions, "
+                f"{self.propagation_time:.3f}s propagating")
+
+
 class CrosswordCreator():
 
+    # SolveStats to collect while searching, or None to collect nothing
+    stats = None
+
     def __init__(self, crossword):
         """
         Create new CSP crossword generate.
@@ -90,7 +120,8 @@ class CrosswordCreator():
         Enforce node and arc consistency, and then solve the CSP.
         """
         self.enforce_node_consistency()
-        self.ac3()
+        if not self.ac3():
+            return None
         return self.backtrack(dict())
 
     def enforce_node_consistency(self):
@@ -99,12 +130,10 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        domains = copy.deepcopy(self.domains)
-        for v in domains:
-            for w in domains[v]:
-                length = v.length
-                if len(w) != v.length:
-                    self.domains[v].remove(w)
+        for v in self.domains:
+            self.domains[v] = {
+                w for w in self.domains[v] if len(w) == v.length
+            }
 
     def revise(self, x, y):
         """
@@ -133,24 +162,43 @@ class CrosswordCreator():
     def ac3(self, arcs=None):
         """
         Update `self.domains` such that each variable is arc consistent.
-        If `arcs` is None, begin with initial list of all arcs in the problem.
+        If `arcs` is None, begin with every arc between overlapping variables.
         Otherwise, use `arcs` as the initial list of arcs to make consistent.
 
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        arc_list = list(self.crossword.overlaps.keys())
-        if arcs is not None:
-            index = [i for i, x in enumerate(arc_list) if x == arcs]
-            arc_list = arc_list[index:, 0:index[0] - 1]
-        while len(arc_list):
-            if self.revise(arc_list[0][0], arc_list[0][1]):
-                for v in self.crossword.neighbors(arc_list[0][0]):
-                    arc_list.append((v, arc_list[0][0]))
-            arc_list = arc_list[1:]
-        for v in self.domains:
-            if len(self.domains[v]) == 0:
+        if arcs is None:
+            if not all(self.domains.values()):
                 return False
+            arcs = (
+                (x, y)
+                for x in self.domains
+                for y in self.crossword.neighbors(x)
+            )
+
+        # Worklist of arcs still to revise, without duplicates
+        queue = deque()
+        queued = set()
+        for arc in arcs:
+            if arc not in queued:
+                queue.append(arc)
+                queued.add(arc)
+
+        while queue:
+            arc = queue.popleft()
+            queued.remove(arc)
+            x, y = arc
+            if not self.revise(x, y):
+                continue
+            if not self.domains[x]:
+                return False
+
+            # Neighbors of `x` may have lost their support in `x`
+            for z in self.crossword.neighbors(x):
+                if z != y and (z, x) not in queued:
+                    queue.append((z, x))
+                    queued.add((z, x))
         return True
 
     def assignment_complete(self, assignment):
@@ -220,14 +268,11 @@ class CrosswordCreator():
         return values.
         """
         unassigned = set(self.domains.keys()) - set(assignment.keys())
-        count = dict()
-        degrees = dict()
-        for k in unassigned:
-            count[k] = len(self.domains[k])
-            degrees[k] = len(self.crossword.neighbors(k))
-        unassigned_var = [k for k, v in count.items() if
-                          v == min(count.values()) and degrees[k] == max(degrees.values())]
-        return unassigned_var[0]
+        return min(
+            unassigned,
+            key=lambda k: (len(self.domains[k]),
+                           -len(self.crossword.neighbors(k)))
+        )
 
     def backtrack(self, assignment):
         """
@@ -239,7 +284,11 @@ class CrosswordCreator():
         If no assignment is possible, return None.
         """
         if self.assignment_complete(assignment):
+            if self.stats is not None:
+                self.stats.solutions += 1
             return assignment
+        if self.stats is not None:
+            self.stats.nodes += 1
         unassigned_variable = self.select_unassigned_variable(assignment)
         domain = self.order_domain_values(unassigned_variable, assignment)
         for word in domain:
@@ -249,31 +298,763 @@ class CrosswordCreator():
                 result = self.backtrack(new_assignment)
                 if result is not None:
                     return result
+                if self.stats is not None:
+                    self.stats.backtracks += 1
         return None
 
 
-def main():
-    # Check usage
-    if len(sys.argv) not in [3, 4]:
-        sys.exit("Usage: python generate.py structure words [output]")
+class BitsetCrosswordCreator(CrosswordCreator):
+    """
+    Crossword generator whose domains are bitsets over a `WordIndex`.
+
+    The domain of a variable is an int whose bit k is set when the kth word
+    of the variable's length is still possible, so revising an arc is a
+    handful of bitwise operations per letter, and counting values is a
+    popcount. Assignments still map variables to words.
+    """
+
+    def __init__(self, crossword):
+        """
+        Create new CSP crossword generate, with bitset domains.
+        """
+        self.crossword = crossword
+        self.index = crossword.word_index()
+        self.domains = {
+            var: self.index.full(var.length)
+            for var in self.crossword.variables
+        }
+        self.trail = None
+
+    def restrict(self, var, domain):
+        """
+        Replace the domain of `var` with `domain`, recording the old domain
+        on the trail when one is being kept.
+        """
+        if self.trail is not None:
+            self.trail.append((var, self.domains[var]))
+        self.domains[var] = domain
+
+    def enforce_node_consistency(self):
+        """
+        Domains only ever hold words of the variable's length, so they are
+        node-consistent by construction.
+        """
+
+    def domain_words(self, var):
+        """
+        Return the list of words in the domain of `var`.
+        """
+        return self.index.decode(var.length, self.domains[var])
+
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y`, keeping only the
+        words of `x` whose overlapping letter is used by some word of `y`.
+
+        Return True if a revision was made to the domain of `x`; return
+        False if no revision was made.
+        """
+        overlap = self.crossword.overlaps[x, y]
+        if not overlap:
+            return False
+        i, j = overlap
+        domain_y = self.domains[y]
+        supported = 0
+        for letter, mask in self.index.position_masks(y.length, j).items():
+            if domain_y & mask:
+                supported |= self.index.letter_mask(x.length, i, letter)
+        revised = self.domains[x] & supported
+        if revised == self.domains[x]:
+            return False
+        self.restrict(x, revised)
+        return True
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables.
+        """
+        used = set(assignment.values())
+        words = [w for w in self.domain_words(var) if w not in used]
+        return sorted(words, key=self.ruled_out(var, assignment))
+
+    def ruled_out(self, var, assignment):
+        """
+        Return a function giving the number of values a word for `var`
+        rules out for the unassigned neighbors of `var`.
+        """
+        # Values ruled out in each unassigned neighbor, by overlapping letter
+        ruled_out = []
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor in assignment:
+                continue
+            i, j = self.crossword.overlaps[var, neighbor]
+            domain = self.domains[neighbor]
+            size = domain.bit_count()
+            ruled_out.append((i, {
+                letter: size - (domain & mask).bit_count()
+                for letter, mask in
+                self.index.position_masks(neighbor.length, j).items()
+            }, size))
+
+        return lambda word: sum(
+            counts.get(word[i], size) for i, counts, size in ruled_out
+        )
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return the unassigned variable with the fewest remaining values,
+        breaking ties by highest degree.
+        """
+        return min(
+            (var for var in self.domains if var not in assignment),
+            key=lambda var: (self.domains[var].bit_count(),
+                             -len(self.crossword.neighbors(var)))
+        )
+
+
+class Restart(Exception):
+    """Raised to abandon a search run that used up its node limit."""
+
+
+class Stopped(Exception):
+    """Raised to abandon a search that ran out of time or was stopped."""
+
+
+class MACCrosswordCreator(BitsetCrosswordCreator):
+    """
+    Crossword generator that maintains arc consistency during search.
+
+    After each assignment, the assigned word is removed from the other
+    domains of its length and arc consistency is restored around every
+    changed variable. Domain changes are recorded on a trail and undone on
+    backtracking, and the assignment is extended and shrunk in place.
+
+    Variables are chosen by fewest remaining values and highest degree
+    ("mrv") or by fewest remaining values per weighted degree ("domwdeg"),
+    where every overlap starts with weight 1 and gains 1 each time revising
+    it wipes out a domain. With a `seed`, ties between variables and values
+    are broken at random, and with `restarts` the search starts over after
+    a node limit that grows with each run, keeping the learned weights.
+    The search gives up, returning None, once `time.time()` passes
+    `deadline` or the `stop` event is set.
+
+    Besides `solve`, `solutions` generates every solution in turn.
+    """
+
+    # Nodes between checks of the deadline and the stop event
+    CHECK_INTERVAL = 64
+
+    # Node limit of the first run when restarting, and its growth per run
+    RESTART_NODES = 100
+    RESTART_GROWTH = 1.5
+
+    def __init__(self, crossword, heuristic="mrv", seed=None, restarts=False,
+                 deadline=None, stop=None):
+        """
+        Create new CSP crossword generate, maintaining arc consistency.
+        """
+        super().__init__(crossword)
+        if heuristic not in ("mrv", "domwdeg"):
+            raise ValueError(f"unknown heuristic {heuristic!r}")
+        self.heuristic = heuristic
+        self.random = None if seed is None else random.Random(seed)
+        self.restarts = restarts
+        self.deadline = deadline
+        self.stop = stop
+        self.weights = dict()
+        self.nodes = 0
+        self.runs = 0
+        self.limit = None
+        self.stopped = False
+
+    def solve(self):
+        """
+        Enforce arc consistency, and then search while maintaining it.
+        """
+        if not self.ac3():
+            return None
+        self.trail = []
+        limit = self.RESTART_NODES if self.restarts else None
+        try:
+            while True:
+                self.runs += 1
+                self.limit = None if limit is None else self.nodes + limit
+                try:
+                    return self.backtrack(dict())
+                except Restart:
+                    self.undo(0)
+                    limit = max(limit + 1, int(limit * self.RESTART_GROWTH))
+        except Stopped:
+            self.stopped = True
+            return None
+        finally:
+            self.trail = None
+
+    def solutions(self, limit=None, distance=1):
+        """
+        Generate solutions one at a time, stopping after `limit` of them.
+
+        Every solution differs from each earlier one in the words of at
+        least `distance` variables; branches that agree with an earlier
+        solution on too many variables are pruned. Restarts are not used,
+        so the search is complete, and the domains are restored once the
+        generator is exhausted or closed.
+        """
+        if not self.ac3():
+            return
+        self.trail = []
+        found = []
+        try:
+            for solution in self.search(dict(), found, distance):
+                found.append(solution)
+                yield solution
+                if limit is not None and len(found) >= limit:
+                    return
+        except Stopped:
+            self.stopped = True
+        finally:
+            self.undo(0)
+            self.trail = None
+
+    def too_close(self, assignment, found, distance):
+        """
+        Return True if `assignment` agrees with some solution in `found` on
+        so many variables that no extension of it is `distance` away.
+        """
+        most = len(self.domains) - distance
+        return any(
+            sum(solution[var] == word for var, word in assignment.items())
+            > most
+            for solution in found
+        )
+
+    def weight(self, x, y):
+        """
+        Return the weight of the overlap between `x` and `y`.
+        """
+        return self.weights.get((x, y) if x < y else (y, x), 1)
 
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y`, adding to the
+        weight of their overlap if the domain of `x` is wiped out.
+        """
+        if not super().revise(x, y):
+            return False
+        if not self.domains[x]:
+            key = (x, y) if x < y else (y, x)
+            self.weights[key] = self.weights.get(key, 1) + 1
+            if self.stats is not None:
+                self.stats.wipeouts += 1
+        return True
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables,
+        breaking ties at random when seeded.
+        """
+        used = set(assignment.values())
+        words = [w for w in self.domain_words(var) if w not in used]
+        if self.random is not None:
+            # Sorting is stable, so ties keep their shuffled order
+            self.random.shuffle(words)
+        return sorted(words, key=self.ruled_out(var, assignment))
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return the unassigned variable chosen by the heuristic, breaking
+        ties at random when seeded.
+        """
+        unassigned = [var for var in self.domains if var not in assignment]
+        if self.random is not None:
+            self.random.shuffle(unassigned)
+        if self.heuristic == "mrv":
+            return min(unassigned, key=lambda var: (
+                self.domains[var].bit_count(),
+                -len(self.crossword.neighbors(var))
+            ))
+        return min(unassigned, key=lambda var: (
+            self.domains[var].bit_count() / max(1, sum(
+                self.weight(var, neighbor)
+                for neighbor in self.crossword.neighbors(var)
+                if neighbor not in assignment
+            ))
+        ))
+
+    def consistent_with(self, var, word, assignment):
+        """
+        Return True if assigning `word` to `var` agrees with every assigned
+        neighbor of `var` and does not reuse an assigned word.
+        """
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor in assignment:
+                i, j = self.crossword.overlaps[var, neighbor]
+                if word[i] != assignment[neighbor][j]:
+                    return False
+        return word not in assignment.values()
+
+    def assign(self, var, word, assignment):
+        """
+        Add `var` = `word` to `assignment` and propagate the consequences.
+        Return False if some domain is wiped out.
+        """
+        if self.stats is None:
+            return self.propagate(var, word, assignment)
+        start = time.perf_counter()
+        consistent = self.propagate(var, word, assignment)
+        self.stats.propagation_time += time.perf_counter() - start
+        return consistent
+
+    def propagate(self, var, word, assignment):
+        """
+        Add `var` = `word` to `assignment`, remove the word from the other
+        domains and restore arc consistency. Return False if some domain is
+        wiped out.
+        """
+        assignment[var] = word
+        bit = 1 << self.index.id(word)
+        self.restrict(var, bit)
+
+        # Words are distinct: remove the word from other domains
+        changed = [var]
+        for other in self.domains:
+            if (other is not var and other.length == var.length
+                    and self.domains[other] & bit):
+                self.restrict(other, self.domains[other] & ~bit)
+                if not self.domains[other]:
+                    if self.stats is not None:
+                        self.stats.wipeouts += 1
+                    return False
+                changed.append(other)
+
+        return self.ac3(
+            (neighbor, x)
+            for x in changed
+            for neighbor in self.crossword.neighbors(x)
+        )
+
+    def undo(self, mark):
+        """
+        Restore the domains recorded on the trail after position `mark`.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            var, domain = trail.pop()
+            self.domains[var] = domain
+
+    def backtrack(self, assignment):
+        """
+        Using Backtracking Search, maintaining arc consistency, extend
+        `assignment` in place and return a complete assignment if possible
+        to do so. If no assignment is possible, return None.
+        """
+        if len(assignment) == len(self.domains):
+            if self.stats is not None:
+                self.stats.solutions += 1
+            return dict(assignment)
+        self.expand()
+        var = self.select_unassigned_variable(assignment)
+        for word in self.order_domain_values(var, assignment):
+            if not self.consistent_with(var, word, assignment):
+                continue
+            mark = len(self.trail)
+            if self.assign(var, word, assignment):
+                result = self.backtrack(assignment)
+                if result is not None:
+                    return result
+            del assignment[var]
+            self.undo(mark)
+            if self.stats is not None:
+                self.stats.backtracks += 1
+        return None
+
+    def search(self, assignment, found, distance):
+        """
+        Generate every complete extension of `assignment` that is at least
+        `distance` away from the solutions in `found`, maintaining arc
+        consistency and extending `assignment` in place.
+        """
+        if len(assignment) == len(self.domains):
+            if self.stats is not None:
+                self.stats.solutions += 1
+            yield dict(assignment)
+            return
+        self.expand()
+        var = self.select_unassigned_variable(assignment)
+        for word in self.order_domain_values(var, assignment):
+            if not self.consistent_with(var, word, assignment):
+                continue
+            mark = len(self.trail)
+            close = False
+            if self.assign(var, word, assignment):
+                close = distance > 1 and self.too_close(
+                    assignment, found, distance
+                )
+                if not close:
+                    yield from self.search(assignment, found, distance)
+            del assignment[var]
+            self.undo(mark)
+            if self.stats is not None:
+                if close:
+                    self.stats.pruned += 1
+                else:
+                    self.stats.backtracks += 1
+
+    def expand(self):
+        """
+        Count a search node, raising Restart once the node limit of the run
+        is used up and Stopped once the deadline passes or `stop` is set.
+        """
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.nodes += 1
+        if self.limit is not None and self.nodes > self.limit:
+            raise Restart
+        if self.nodes % self.CHECK_INTERVAL == 0 and (
+                self.deadline is not None and time.time() > self.deadline
+                or self.stop is not None and self.stop.is_set()):
+            raise Stopped
+
+
+class CBJCrosswordCreator(BitsetCrosswordCreator):
+    """
+    Crossword generator using forward checking with conflict-directed
+    backjumping and nogood learning.
+
+    Each domain change made while assigning a variable is recorded on the
+    trail together with that variable, so the conflict set of a wiped-out
+    domain is exactly the assigned variables that pruned it. When every
+    word of a variable fails, search jumps back to the most recent variable
+    in its conflict set, skipping the levels in between, and the words of
+    the conflict set are recorded as a nogood, a combination that is never
+    tried again. Nogoods of more than `max_nogood` assignments are dropped.
+    """
+
+    def __init__(self, crossword, max_nogood=4):
+        """
+        Create new CSP crossword generate, with backjumping.
+        """
+        super().__init__(crossword)
+        self.max_nogood = max_nogood
+        self.pruners = {var: [] for var in self.crossword.variables}
+        self.nogoods = dict()
+        self.current = None
+
+    def solve(self):
+        """
+        Enforce arc consistency, and then search with backjumping.
+        """
+        if not self.ac3():
+            return None
+        self.trail = []
+        try:
+            result = self.backtrack(dict())
+        finally:
+            self.trail = None
+        return result if isinstance(result, dict) else None
+
+    def restrict(self, var, domain):
+        """
+        Replace the domain of `var` with `domain`, recording the old domain
+        and the variable being assigned on the trail when one is being kept.
+        """
+        if self.trail is not None:
+            self.trail.append((var, self.domains[var]))
+            self.pruners[var].append(self.current)
+        self.domains[var] = domain
+
+    def undo(self, mark):
+        """
+        Restore the domains recorded on the trail after position `mark`.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            var, domain = trail.pop()
+            self.domains[var] = domain
+            self.pruners[var].pop()
+
+    def forward_check(self, var, word, assignment):
+        """
+        Assign `var` = `word` and remove the words that disagree with it
+        from the domains of unassigned variables. Return a variable whose
+        domain is wiped out, or None.
+        """
+        self.current = var
+        assignment[var] = word
+        bit = 1 << self.index.id(word)
+        self.restrict(var, bit)
+
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor in assignment:
+                continue
+            i, j = self.crossword.overlaps[var, neighbor]
+            domain = self.domains[neighbor]
+            revised = domain & self.index.letter_mask(
+                neighbor.length, j, word[i]
+            )
+            if revised != domain:
+                self.restrict(neighbor, revised)
+                if not revised:
+                    return neighbor
+
+        # Words are distinct: remove the word from other domains
+        for other in self.domains:
+            if (other not in assignment and other.length == var.length
+                    and self.domains[other] & bit):
+                self.restrict(other, self.domains[other] & ~bit)
+                if not self.domains[other]:
+                    return other
+        return None
+
+    def violated_nogood(self, var, word, assignment):
+        """
+        Return a recorded nogood that assigning `word` to `var` would
+        complete, or None.
+        """
+        for nogood in self.nogoods.get((var, word), ()):
+            if all(assignment.get(other) == value
+                   for other, value in nogood if other is not var):
+                return nogood
+        return None
+
+    def record_nogood(self, conflict, assignment):
+        """
+        Record the current words of the variables in `conflict` as a
+        combination that cannot be extended to a solution.
+        """
+        if not conflict or len(conflict) > self.max_nogood:
+            return
+        nogood = frozenset((var, assignment[var]) for var in conflict)
+        for pair in nogood:
+            self.nogoods.setdefault(pair, []).append(nogood)
+
+    def backtrack(self, assignment):
+        """
+        Using Backtracking Search with conflict-directed backjumping, extend
+        `assignment` in place and return a complete assignment if possible
+        to do so. Otherwise return the conflict set: the assigned variables
+        whose words together left no way to complete the assignment.
+        """
+        stats = self.stats
+        if len(assignment) == len(self.domains):
+            if stats is not None:
+                stats.solutions += 1
+            return dict(assignment)
+        if stats is not None:
+            stats.nodes += 1
+        var = self.select_unassigned_variable(assignment)
+
+        # Assigned variables that pruned the domain of `var`
+        conflict = set(self.pruners[var])
+        for word in self.order_domain_values(var, assignment):
+            nogood = self.violated_nogood(var, word, assignment)
+            if nogood is not None:
+                conflict.update(other for other, _ in nogood)
+                continue
+            mark = len(self.trail)
+            if stats is None:
+                wiped = self.forward_check(var, word, assignment)
+            else:
+                start = time.perf_counter()
+                wiped = self.forward_check(var, word, assignment)
+                stats.propagation_time += time.perf_counter() - start
+                stats.wipeouts += wiped is not None
+            if wiped is not None:
+                conflict.update(self.pruners[wiped])
+            else:
+                result = self.backtrack(assignment)
+                if isinstance(result, dict):
+                    return result
+                if var not in result:
+                    # This level is irrelevant to the failure: jump over it
+                    del assignment[var]
+                    self.undo(mark)
+                    if stats is not None:
+                        stats.backtracks += 1
+                    return result
+                conflict |= result
+            del assignment[var]
+            self.undo(mark)
+            if stats is not None:
+                stats.backtracks += 1
+
+        conflict.discard(var)
+        self.record_nogood(conflict, assignment)
+        return conflict
+
+
+# Searches run side by side by the portfolio, as MACCrosswordCreator options
+PORTFOLIO = [
+    {"heuristic": "mrv"},
+    {"heuristic": "domwdeg"},
+    {"heuristic": "mrv", "seed": 1, "restarts": True},
+    {"heuristic": "domwdeg", "seed": 2, "restarts": True},
+]
+
+
+class PortfolioCrosswordCreator(CrosswordCreator):
+    """
+    Crossword generator that runs several differently configured searches
+    in a process pool and returns the first solution found.
+
+    Each entry of `configs` gives the options of one MACCrosswordCreator.
+    Once a worker finds a solution, or proves there is none, the others are
+    stopped; all of them give up after `budget` seconds. Afterwards
+    `reports` holds one dict per search with its options, status, nodes explored,
+    number of runs and elapsed time.
+    """
+
+    def __init__(self, crossword, configs=PORTFOLIO, processes=None,
+                 budget=None):
+        """
+        Create new CSP crossword generate, running a portfolio of searches.
+        The searches build their own domains, so none are kept here.
+        """
+        self.crossword = crossword
+        self.configs = configs
+        self.processes = processes or min(len(configs), os.cpu_count() or 1)
+        self.budget = budget
+        self.reports = []
+
+    def solve(self):
+        """
+        Run every search of the portfolio, and return the first solution.
+        """
+        deadline = None if self.budget is None else time.time() + self.budget
+        stop = multiprocessing.Event()
+        solution = None
+        self.reports = []
+        with multiprocessing.Pool(
+            self.processes, initializer=start_portfolio_worker,
+            initargs=(self.crossword, stop)
+        ) as pool:
+            tasks = [(config, deadline) for config in self.configs]
+            for assignment, report in pool.imap_unordered(
+                    run_portfolio_worker, tasks):
+                self.reports.append(report)
+                if solution is None and assignment is not None:
+                    solution = assignment
+        return solution
+
+
+# Crossword and stop event of the portfolio, within a worker process
+worker = dict()
+
+
+def start_portfolio_worker(crossword, stop):
+    """
+    Initialize a portfolio worker process.
+    """
+    worker["crossword"] = crossword
+    worker["stop"] = stop
+
+
+def run_portfolio_worker(task):
+    """
+    Run one search of the portfolio in a worker process. `task` holds the
+    options of its MACCrosswordCreator and the deadline shared by every
+    search. Return the solution (or None) and a report of the options,
+    status, nodes, runs and time.
+    """
+    config, deadline = task
+    stop = worker["stop"]
+    creator = MACCrosswordCreator(
+        worker["crossword"], deadline=deadline, stop=stop, **config
+    )
+    start = time.perf_counter()
+    assignment = None
+    if stop.is_set():
+        status = "stopped"
+    else:
+        assignment = creator.solve()
+        if assignment is not None:
+            status = "solved"
+        elif creator.stopped:
+            status = "stopped"
+        else:
+            status = "unsatisfiable"
+        if status != "stopped":
+            stop.set()
+    return assignment, {
+        "config": config,
+        "status": status,
+        "nodes": creator.nodes,
+        "runs": creator.runs,
+        "time": time.perf_counter() - start,
+    }
+
+
+# Solver modes, mapping name to the generator class that implements it
+MODES = {
+    "backtrack": CrosswordCreator,
+    "bitset": BitsetCrosswordCreator,
+    "mac": MACCrosswordCreator,
+    "cbj": CBJCrosswordCreator,
+    "portfolio": PortfolioCrosswordCreator,
+}
+
+
+def main():
     # Parse command-line arguments
-    structure = sys.argv[1]
-    words = sys.argv[2]
-    output = sys.argv[3] if len(sys.argv) == 4 else None
+    parser = argparse.ArgumentParser(
+        usage="python generate.py structure words [output] [--mode MODE] "
+              "[--budget SECONDS] [--solutions N [--distance D]] [--stats]"
+    )
+    parser.add_argument("structure")
+    parser.add_argument("words")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument("--mode", choices=sorted(MODES), default="backtrack")
+    parser.add_argument("--budget", type=float,
+                        help="seconds before the portfolio gives up")
+    parser.add_argument("--solutions", type=int,
+                        help="number of solutions to generate (mac mode)")
+    parser.add_argument("--distance", type=int, default=1,
+                        help="words in which every two solutions differ")
+    parser.add_argument("--stats", action="store_true",
+                        help="print search statistics")
+    args = parser.parse_args()
+    if args.solutions is not None and args.mode != "mac":
+        parser.error("--solutions requires --mode mac")
 
     # Generate crossword
-    crossword = Crossword(structure, words)
-    creator = CrosswordCreator(crossword)
-    assignment = creator.solve()
+    crossword = Crossword(args.structure, args.words)
+    if args.mode == "portfolio":
+        creator = PortfolioCrosswordCreator(crossword, budget=args.budget)
+    else:
+        creator = MODES[args.mode](crossword)
+    if args.stats:
+        creator.stats = SolveStats()
+    if args.solutions is not None:
+        assignments = list(creator.solutions(args.solutions, args.distance))
+    else:
+        assignment = creator.solve()
+        assignments = [] if assignment is None else [assignment]
+
+    # Print portfolio reports and statistics
+    if args.mode == "portfolio":
+        for report in creator.reports:
+            options = ", ".join(f"{k}={v}" for k, v in report["config"].items())
+            print(f"{options}: {report['status']} after {report['nodes']} "
+                  f"nodes in {report['runs']} runs, {report['time']:.2f}s",
+                  file=sys.stderr)
+    if args.stats and args.mode != "portfolio":
+        print(creator.stats, file=sys.stderr)
 
     # Print result
-    if assignment is None:
+    if not assignments:
         print("No solution.")
-    else:
+    for k, assignment in enumerate(assignments):
+        if k:
+            print()
         creator.print(assignment)
-        if output:
-            creator.save(assignment, output)
+        if args.output:
+            if len(assignments) > 1:
+                root, ext = os.path.splitext(args.output)
+                creator.save(assignment, f"{root}-{k + 1}{ext}")
+            else:
+                creator.save(assignment, args.output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+import argparse
+import random
+import sys
+from collections import deque
+
+# Relative frequencies of letters in English text, for synthetic words
+LETTER_FREQUENCIES = {
+    "a": 8.2, "b": 1.5, "c": 2.8, "d": 4.3, "e": 12.7, "f": 2.2, "g": 2.0,
+    "h": 6.1, "i": 7.0, "j": 0.15, "k": 0.77, "l": 4.0, "m": 2.4, "n": 6.7,
+    "o": 7.5, "p": 1.9, "q": 0.095, "r": 6.0, "s": 6.3, "t": 9.1, "u": 2.8,
+    "v": 0.98, "w": 2.4, "x": 0.15, "y": 2.0, "z": 0.074,
+}
+
+# Shortest word allowed in a generated grid
+MIN_WORD = 3
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a crossword structure and a synthetic words "
+                    "file for generate.py."
+    )
+    parser.add_argument("structure", nargs="?",
+                        help="structure file to write (default: standard output)")
+    parser.add_argument("--size", type=int, default=9,
+                        help="width and height of the grid")
+    parser.add_argument("--blacks", type=int, default=None,
+                        help="number of black squares (default: a sixth)")
+    parser.add_argument("--words", metavar="FILE",
+                        help="also write a synthetic words file")
+    parser.add_argument("--count", type=int, default=20000,
+                        help="number of synthetic words")
+    parser.add_argument("--source", metavar="FILE",
+                        help="words file whose letter pairs the synthetic "
+                             "words imitate")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    blacks = args.size * args.size // 6 if args.blacks is None else args.blacks
+    grid = generate_grid(args.size, blacks, seed=args.seed)
+    if args.structure:
+        with open(args.structure, "w") as f:
+            write_structure(grid, f)
+    else:
+        write_structure(grid, sys.stdout)
+
+    if args.words:
+        source = None
+        if args.source:
+            with open(args.source) as f:
+                source = f.read().splitlines()
+        words = generate_dictionary(args.count, lengths=(MIN_WORD, args.size),
+                                    source=source, seed=args.seed)
+        with open(args.words, "w") as f:
+            write_words(words, f)
+
+
+def generate_grid(size, blacks, seed=None):
+    """
+    Generate an American-style square grid, as a list of rows in which
+    True marks a white square.
+
+    Black squares are placed in pairs related by 180-degree rotation, so the
+    grid looks the same upside down, and a pair is only kept if every run of
+    white squares across and down is still at least MIN_WORD long and the
+    white squares stay connected. Squares are tried in random order until
+    `blacks` are placed or none fits, so the grid may have fewer.
+    """
+    if size < MIN_WORD:
+        raise ValueError(f"grids must be at least {MIN_WORD} squares wide")
+    rng = random.Random(seed)
+    grid = [[True] * size for _ in range(size)]
+    cells = [
+        (i, j) for i in range(size) for j in range(size)
+        if (i, j) <= (size - 1 - i, size - 1 - j)
+    ]
+    rng.shuffle(cells)
+
+    placed = 0
+    for i, j in cells:
+        mirror = (size - 1 - i, size - 1 - j)
+        pair = 1 if (i, j) == mirror else 2
+        if placed + pair > blacks:
+            continue
+        grid[i][j] = grid[mirror[0]][mirror[1]] = False
+        if valid_grid(grid):
+            placed += pair
+        else:
+            grid[i][j] = grid[mirror[0]][mirror[1]] = True
+    return grid
+
+
+def valid_grid(grid):
+    """
+    Return True if every run of white squares in `grid` is at least
+    MIN_WORD long and the white squares are connected.
+    """
+    columns = [list(column) for column in zip(*grid)]
+    for line in grid + columns:
+        run = 0
+        for white in line + [False]:
+            if white:
+                run += 1
+            elif run:
+                if run < MIN_WORD:
+                    return False
+                run = 0
+
+    whites = {
+        (i, j) for i, row in enumerate(grid)
+        for j, white in enumerate(row) if white
+    }
+    if not whites:
+        return False
+    start = next(iter(whites))
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        i, j = queue.popleft()
+        for cell in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            if cell in whites and cell not in seen:
+                seen.add(cell)
+                queue.append(cell)
+    return len(seen) == len(whites)
+
+
+def generate_dictionary(count, lengths=(3, 9), source=None, seed=None):
+    """
+    Generate a sorted list of `count` distinct lowercase words with lengths
+    drawn uniformly from the inclusive range `lengths`.
+
+    Without a `source`, letters are drawn independently with their English
+    frequencies. With a `source` list of words, each letter is drawn given
+    the one before it, with the frequencies of letter pairs in `source`,
+    which gives words that interlock more like real ones.
+    """
+    shortest, longest = lengths
+    rng = random.Random(seed)
+    letters = list(LETTER_FREQUENCIES)
+    weights = list(LETTER_FREQUENCIES.values())
+
+    # Letters following each letter in the source, with their counts;
+    # None stands for the start of a word
+    following = dict()
+    for word in source or ():
+        previous = None
+        for letter in word.lower():
+            if letter in LETTER_FREQUENCIES:
+                counts = following.setdefault(previous, dict())
+                counts[letter] = counts.get(letter, 0) + 1
+                previous = letter
+    choices = {
+        previous: (list(counts), list(counts.values()))
+        for previous, counts in following.items()
+    }
+
+    # Stop once enough words are found or far too many draws were repeats
+    words = set()
+    attempts = 0
+    while len(words) < count and attempts < 100 * count:
+        attempts += 1
+        length = rng.randint(shortest, longest)
+        word = []
+        for _ in range(length):
+            previous = word[-1] if word else None
+            population, frequencies = choices.get(previous, (letters, weights))
+            word.append(rng.choices(population, frequencies)[0])
+        words.add("".join(word))
+    return sorted(words)
+
+
+def write_structure(grid, f):
+    """
+    Write `grid` to the open file `f` in the format read by `Crossword`.
+    """
+    for row in grid:
+        f.write("".join("_" if white else "#" for white in row) + "\n")
+
+
+def write_words(words, f):
+    """
+    Write `words` to the open file `f`, one per line.
+    """
+    for word in words:
+        f.write(word + "\n")
+
+
+if __name__ == "__main__":
+    main()
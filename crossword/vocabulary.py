@@ -0,0 +1,23 @@
+import argparse
+import time
+
+from crossword import compile_vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a words file into a memory-mappable vocabulary "
+                    "that generate.py loads in place of the words file."
+    )
+    parser.add_argument("words", help="text file with one word per line")
+    parser.add_argument("output", help="compiled vocabulary to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = compile_vocabulary(args.words, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Compiled {count} words into {args.output} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import time
+import tracemalloc
+
+from heredity import enumerate_probabilities
+from pedigree import generate_pedigree
+
+# Pedigree configurations: (generations, founders, loops, evidence, children),
+# all small enough for the default --max-people. Enumeration grows as 6 to
+# the number of people, so larger pedigrees, and the ones with several
+# loops, cannot be timed with it.
+CONFIGS = [
+    (2, 2, 0, 0.5, (1, 2)),
+    (2, 2, 0, 0.0, (2, 3)),
+    (2, 3, 0, 1.0, (1, 1)),
+    (3, 3, 0, 0.5, (1, 1)),
+    (3, 2, 1, 0.5, (2, 2)),
+    (3, 2, 1, 0.0, (2, 2)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time heredity.py enumeration on synthetic pedigrees."
+    )
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--max-people", type=int, default=7,
+                        help="largest pedigree to enumerate")
+    args = parser.parse_args()
+
+    header = (f"{'gens':>4} {'fnd':>3} {'loops':>5} {'evid':>4} {'people':>6}"
+              f"  {'time (s)':>9} {'peak KiB':>9}")
+    print(header)
+    print("-" * len(header))
+    for row in run_benchmark(CONFIGS, args.seed, args.max_people):
+        config = (f"{row['generations']:>4} {row['founders']:>3} "
+                  f"{row['loops']:>5} {row['evidence']:>4} {row['people']:>6}")
+        if row["time"] is None:
+            print(f"{config}  skipped (too large to enumerate)")
+            continue
+        print(f"{config}  {row['time']:>9.3f} {row['memory'] / 1024:>9.1f}")
+
+
+def run_benchmark(configs, seed=3, max_people=7):
+    """
+    Run `enumerate_probabilities` on a pedigree generated for each
+    configuration.
+
+    Return a list of result rows recording runtime and peak memory allocated
+    during inference. Pedigrees of more than `max_people` people are not
+    run, and their rows have None for both.
+    """
+    rows = []
+    for generations, founders, loops, evidence, children in configs:
+        people = generate_pedigree(generations=generations, founders=founders,
+                                   loops=loops, evidence=evidence,
+                                   children=children, seed=seed)
+        row = {
+            "generations": generations,
+            "founders": founders,
+            "loops": loops,
+            "evidence": evidence,
+            "people": len(people),
+            "time": None,
+            "memory": None
+        }
+        if len(people) <= max_people:
+            row["time"], row["memory"] = measure(people)
+        rows.append(row)
+    return rows
+
+
+def measure(people):
+    """
+    Return the seconds `enumerate_probabilities` takes on `people` and the
+    peak memory it allocates. tracemalloc slows every allocation down, so
+    the peak comes from a separate, untimed run.
+    """
+    start = time.perf_counter()
+    enumerate_probabilities(people)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        enumerate_probabilities(people)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import random
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic pedigree CSV for heredity.py."
+    )
+    parser.add_argument("output", nargs="?",
+                        help="CSV file to write (default: standard output)")
+    parser.add_argument("--generations", type=int, default=3,
+                        help="number of generations, including founders")
+    parser.add_argument("--founders", type=int, default=4,
+                        help="number of unrelated people in the first generation")
+    parser.add_argument("--loops", type=int, default=0,
+                        help="number of marriages between blood relatives")
+    parser.add_argument("--evidence", type=float, default=0.5,
+                        help="fraction of people whose trait is known")
+    parser.add_argument("--children", type=int, nargs=2, default=(1, 3),
+                        metavar=("MIN", "MAX"),
+                        help="range of children per couple")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    people = generate_pedigree(
+        generations=args.generations,
+        founders=args.founders,
+        loops=args.loops,
+        evidence=args.evidence,
+        children=tuple(args.children),
+        seed=args.seed
+    )
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_csv(people, f)
+    else:
+        write_csv(people, sys.stdout)
+
+
+def generate_pedigree(generations=3, founders=4, loops=0, evidence=0.5,
+                      children=(1, 3), seed=None):
+    """
+    Generate a random pedigree in the format returned by `load_data`.
+
+    The first generation consists of `founders` unrelated people. Each later
+    generation is produced by pairing up the previous generation into
+    couples, and every couple has between `children[0]` and `children[1]`
+    children. When a generation has nobody to pair with, an unrelated spouse
+    is married in as an additional founder. Up to `loops` couples are chosen
+    among blood relatives (cousins preferred over siblings), which creates
+    loops in the pedigree graph. Each person's trait is observed with
+    probability `evidence`.
+    """
+    if generations < 1:
+        raise ValueError("need at least one generation")
+    if founders < 1:
+        raise ValueError("need at least one founder")
+    if not 0 <= evidence <= 1:
+        raise ValueError("evidence must be between 0 and 1")
+
+    rng = random.Random(seed)
+    people = dict()
+    sex = dict()
+    ancestors = dict()
+
+    def new_person(mother=None, father=None, female=None):
+        name = f"P{len(people) + 1:03d}"
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": None
+        }
+        sex[name] = rng.random() < 0.5 if female is None else female
+        ancestors[name] = set()
+        for parent in (mother, father):
+            if parent is not None:
+                ancestors[name] |= {parent} | ancestors[parent]
+        return name
+
+    generation = [new_person() for _ in range(founders)]
+    remaining_loops = loops
+    for _ in range(generations - 1):
+        couples, remaining_loops = pair_couples(
+            generation, sex, ancestors, remaining_loops, rng
+        )
+
+        # Nobody to pair with: marry in an unrelated spouse
+        paired = {person for couple in couples for person in couple}
+        for person in generation:
+            if person not in paired:
+                spouse = new_person(female=not sex[person])
+                couples.append((person, spouse) if sex[person]
+                               else (spouse, person))
+
+        generation = []
+        for mother, father in couples:
+            for _ in range(rng.randint(*children)):
+                generation.append(new_person(mother, father))
+        if not generation:
+            break
+
+    # Reveal traits at the requested evidence density
+    for person in people.values():
+        if rng.random() < evidence:
+            person["trait"] = rng.random() < 0.3
+    return people
+
+
+def pair_couples(generation, sex, ancestors, loops, rng):
+    """
+    Pair up people of one generation as (mother, father) couples.
+
+    Up to `loops` couples are drawn from pairs that share an ancestor,
+    preferring the most distant relatives; everyone else is paired with an
+    unrelated partner where possible. Return the couples and the number of
+    loops still to be created.
+    """
+    women = [p for p in generation if sex[p]]
+    men = [p for p in generation if not sex[p]]
+    rng.shuffle(women)
+    rng.shuffle(men)
+    couples = []
+
+    def siblings(a, b):
+        return bool(ancestors[a] & ancestors[b]) and (
+            ancestors[a] == ancestors[b]
+        )
+
+    while loops > 0:
+        related = [
+            (siblings(w, m), w, m) for w in women for m in men
+            if ancestors[w] & ancestors[m]
+        ]
+        if not related:
+            break
+        _, woman, man = min(related, key=lambda pair: pair[0])
+        women.remove(woman)
+        men.remove(man)
+        couples.append((woman, man))
+        loops -= 1
+
+    for woman in women[:]:
+        for man in men:
+            if not ancestors[woman] & ancestors[man]:
+                women.remove(woman)
+                men.remove(man)
+                couples.append((woman, man))
+                break
+    return couples, loops
+
+
+def write_csv(people, f):
+    """
+    Write `people` to the open file `f` in the CSV format of `load_data`.
+    """
+    writer = csv.writer(f)
+    writer.writerow(["name", "mother", "father", "trait"])
+    for person in people.values():
+        trait = person["trait"]
+        writer.writerow([
+            person["name"],
+            person["mother"] or "",
+            person["father"] or "",
+            "" if trait is None else int(trait)
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import multiprocessing
+
+from logic import *
+from compiler import BITSET, chunk_header, chunk_patterns, expression, symbol_index
+from sat import CNF, Solver
+
+# Possible answers to a query
+ENTAILED = "entailed"
+CONTRADICTED = "contradicted"
+UNKNOWN = "unknown"
+
+
+def entailments(knowledge, queries, method="enumerate", processes=None,
+                chunk_bits=16):
+    """
+    Answers many queries against one knowledge base together.
+
+    Returns a dict mapping each query to ENTAILED if it is true in every
+    model of the knowledge base, CONTRADICTED if it is false in every model,
+    and UNKNOWN otherwise. As with `model_check`, every query is entailed by
+    a knowledge base that has no models.
+
+    With method "enumerate", the models of the knowledge base are
+    enumerated once as chunks of bitsets and every query is evaluated on
+    each chunk; `processes` splits the enumeration across a process pool,
+    each worker fixing a different assignment of the outer symbols. With
+    method "sat", a single incremental solver looks for a model with each
+    query true and one with it false, and every model found also settles
+    the other queries it covers.
+    """
+    queries = list(queries)
+    if method == "enumerate":
+        can_be_true, can_be_false = enumerate_queries(
+            knowledge, queries, processes, chunk_bits
+        )
+    elif method == "sat":
+        can_be_true, can_be_false = solve_queries(knowledge, queries)
+    else:
+        raise ValueError(f"unknown method {method!r}")
+
+    answers = dict()
+    for i, query in enumerate(queries):
+        if not can_be_false >> i & 1:
+            answers[query] = ENTAILED
+        elif not can_be_true >> i & 1:
+            answers[query] = CONTRADICTED
+        else:
+            answers[query] = UNKNOWN
+    return answers
+
+
+def enumerate_queries(knowledge, queries, processes=None, chunk_bits=16):
+    """
+    Returns two bitmasks over `queries`: bit i of the first is set if query i
+    is true in some model of the knowledge base, and bit i of the second if
+    it is false in some model.
+    """
+    names, index = symbol_index(knowledge, *queries)
+    inner = min(len(names), chunk_bits)
+    source = query_source(knowledge, queries, names, index, inner)
+    count = 1 << (len(names) - inner)
+    done = (1 << len(queries)) - 1
+
+    if not processes or processes < 2 or count < 2:
+        return check_slice((source, inner, 0, count))
+
+    # Split the outer assignments into a few slices per worker
+    slices = min(count, 4 * processes)
+    bounds = [count * k // slices for k in range(slices + 1)]
+    tasks = [(source, inner, bounds[k], bounds[k + 1]) for k in range(slices)]
+    can_be_true = can_be_false = 0
+    with multiprocessing.Pool(processes) as pool:
+        for true, false in pool.imap_unordered(check_slice, tasks):
+            can_be_true |= true
+            can_be_false |= false
+            if can_be_true & can_be_false == done:
+                break
+    return can_be_true, can_be_false
+
+
+def query_source(knowledge, queries, names, index, inner):
+    """
+    Returns source for a function that enumerates one slice of the outer
+    assignments and returns the query bitmasks of `enumerate_queries`.
+    """
+    done = (1 << len(queries)) - 1
+    lines = ["def check(patterns, full, start, stop):",
+             "    true = false = 0"]
+    lines.extend(chunk_header(len(names), inner, "range(start, stop)"))
+    lines.extend([
+        f"        kb = {expression(knowledge, index, BITSET)}",
+        "        if not kb:",
+        "            continue",
+    ])
+    for i, query in enumerate(queries):
+        lines.extend([
+            f"        q = {expression(query, index, BITSET)}",
+            "        if kb & q:",
+            f"            true |= {1 << i}",
+            "        if kb & (q ^ full):",
+            f"            false |= {1 << i}",
+        ])
+    lines.extend([
+        f"        if true & false == {done}:",
+        "            break",
+        "    return true, false",
+    ])
+    return "\n".join(lines)
+
+
+# Functions compiled by `check_slice`, by source, within this process
+compiled = dict()
+
+
+def check_slice(task):
+    """
+    Returns the query bitmasks of `enumerate_queries` over one slice of the
+    outer assignments. `task` is the function's source from `query_source`,
+    the number of inner symbols, and the first and past-the-last outer
+    assignments of the slice. The function is compiled once per process.
+    """
+    source, inner, start, stop = task
+    if source not in compiled:
+        namespace = dict()
+        exec(source, namespace)
+        compiled[source] = namespace["check"]
+    full, patterns = chunk_patterns(inner)
+    return compiled[source](patterns, full, start, stop)
+
+
+def solve_queries(knowledge, queries):
+    """
+    Returns the query bitmasks of `enumerate_queries`, computed with an
+    incremental SAT solver instead of by enumeration.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    lits = [cnf.literal(query) for query in queries]
+    solver = Solver(cnf.num_vars)
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+
+    can_be_true = can_be_false = 0
+
+    def record(model):
+        nonlocal can_be_true, can_be_false
+        for i, lit in enumerate(lits):
+            if model[abs(lit)] == (lit > 0):
+                can_be_true |= 1 << i
+            else:
+                can_be_false |= 1 << i
+
+    if not solver.solve():
+        return 0, 0
+    record(solver.model)
+    for i, lit in enumerate(lits):
+        if not can_be_true >> i & 1 and solver.solve([lit]):
+            record(solver.model)
+        if not can_be_false >> i & 1 and solver.solve([-lit]):
+            record(solver.model)
+    return can_be_true, can_be_false
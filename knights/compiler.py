@@ -0,0 +1,157 @@
+from logic import *
+
+
+# Source templates for evaluating a sentence over an integer model `m`,
+# in which bit k holds the value of the kth symbol
+BOOLEAN = {
+    "symbol": "(m & {bit})",
+    "true": "True",
+    "false": "False",
+    "not": "(not {0})",
+    "and": " and ",
+    "or": " or ",
+    "implication": "(not {0} or {1})",
+    "biconditional": "((not {0}) == (not {1}))",
+}
+
+# Source templates for evaluating a sentence over many models at once,
+# where `s{k}` is a bitset whose bit j holds the kth symbol's value in
+# model j, and `full` has a bit set for every model
+BITSET = {
+    "symbol": "s{k}",
+    "true": "full",
+    "false": "0",
+    "not": "({0} ^ full)",
+    "and": " & ",
+    "or": " | ",
+    "implication": "(({0} ^ full) | {1})",
+    "biconditional": "({0} ^ {1} ^ full)",
+}
+
+
+def expression(sentence, index, ops=BOOLEAN):
+    """
+    Returns Python source for an expression equivalent to `sentence`,
+    where `index` maps each symbol name to its position k and `ops` gives
+    the source templates of the target representation.
+    """
+    if isinstance(sentence, Symbol):
+        k = index[sentence.name]
+        return ops["symbol"].format(k=k, bit=1 << k)
+    if isinstance(sentence, Not):
+        return ops["not"].format(expression(sentence.operand, index, ops))
+    if isinstance(sentence, And):
+        if not sentence.conjuncts:
+            return ops["true"]
+        return "(" + ops["and"].join(
+            expression(conjunct, index, ops)
+            for conjunct in sentence.conjuncts
+        ) + ")"
+    if isinstance(sentence, Or):
+        if not sentence.disjuncts:
+            return ops["false"]
+        return "(" + ops["or"].join(
+            expression(disjunct, index, ops)
+            for disjunct in sentence.disjuncts
+        ) + ")"
+    if isinstance(sentence, Implication):
+        return ops["implication"].format(
+            expression(sentence.antecedent, index, ops),
+            expression(sentence.consequent, index, ops)
+        )
+    if isinstance(sentence, Biconditional):
+        return ops["biconditional"].format(
+            expression(sentence.left, index, ops),
+            expression(sentence.right, index, ops)
+        )
+    raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+
+def symbol_index(*sentences):
+    """
+    Returns a sorted list of the symbols in `sentences` and a dict mapping
+    each symbol to its bit position.
+    """
+    names = sorted(set().union(*(s.symbols() for s in sentences)))
+    return names, {name: k for k, name in enumerate(names)}
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by enumerating every model as
+    an integer inside a single generated function.
+    """
+    names, index = symbol_index(knowledge, query)
+    source = "\n".join([
+        "def check(count):",
+        "    for m in range(count):",
+        f"        if {expression(knowledge, index)} "
+        f"and not {expression(query, index)}:",
+        "            return False",
+        "    return True",
+    ])
+    namespace = dict()
+    exec(source, namespace)
+    return namespace["check"](1 << len(names))
+
+
+def chunk_patterns(inner):
+    """
+    Returns the bitset of all 2 ** `inner` models in a chunk, and a list
+    holding for each inner symbol k the bitset of models in which it is
+    true: bit j of pattern k is bit k of j.
+    """
+    full = (1 << (1 << inner)) - 1
+    patterns = []
+    for k in range(inner):
+        # Blocks of 2 ** k zeros then 2 ** k ones, repeated
+        width = 1 << k
+        block = ((1 << width) - 1) << width
+        patterns.append(full // ((1 << (2 * width)) - 1) * block)
+    return full, patterns
+
+
+def chunk_header(count, inner, outer):
+    """
+    Returns source lines that bind `s0` ... `s{count - 1}` for a chunked
+    bitset loop: the first `inner` symbols from `patterns`, and the rest
+    from the bits of the loop variable `o`, which ranges over `outer`.
+    The body of the loop should be indented by eight spaces.
+    """
+    lines = []
+    if inner:
+        unpack = ", ".join(f"s{k}" for k in range(inner))
+        lines.append(f"    {unpack}, = patterns")
+    lines.append(f"    for o in {outer}:")
+    for k in range(inner, count):
+        lines.append(f"        s{k} = full if o & {1 << (k - inner)} else 0")
+    return lines
+
+
+def bitset_check(knowledge, query, chunk_bits=16):
+    """
+    Checks if knowledge base entails query, evaluating 2 ** `chunk_bits`
+    models at a time as packed bitsets.
+
+    The first `chunk_bits` symbols vary within a chunk: symbol k is the
+    bitset whose bit j is set when bit k of j is, so every connective is a
+    single whole-chunk integer operation. The remaining symbols are
+    enumerated one chunk after another, which bounds memory by the chunk
+    size, and the check stops at the first chunk containing a model of the
+    knowledge base in which the query is false.
+    """
+    names, index = symbol_index(knowledge, query)
+    inner = min(len(names), chunk_bits)
+    full, patterns = chunk_patterns(inner)
+
+    lines = ["def check(patterns, full, count):"]
+    lines.extend(chunk_header(len(names), inner, "range(count)"))
+    lines.extend([
+        f"        if {expression(knowledge, index, BITSET)} "
+        f"& ({expression(query, index, BITSET)} ^ full):",
+        "            return False",
+        "    return True",
+    ])
+    namespace = dict()
+    exec("\n".join(lines), namespace)
+    return namespace["check"](patterns, full, 1 << (len(names) - inner))
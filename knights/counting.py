@@ -0,0 +1,172 @@
+from sat import CNF
+
+
+def count_models(sentence, symbols=()):
+    """
+    Returns the number of models of `sentence`, that is, the number of
+    assignments to its symbols (and to any extra `symbols`, given as names)
+    in which it is true.
+
+    The sentence is converted to CNF with the Tseitin encoding, which keeps
+    the number of models, and counted by a DPLL-style search that splits
+    the clauses into independent components, multiplies their counts and
+    caches the count of every component it has seen.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    extra = set(symbols) - set(sentence.symbols())
+    clauses = [tuple(sorted(set(clause))) for clause in cnf.clauses]
+    return run(count_clauses(clauses, cnf.num_vars, dict())) << len(extra)
+
+
+def run(task):
+    """
+    Runs a recursive computation written as a generator, which yields the
+    generators of its subcomputations and receives their results, using an
+    explicit stack instead of Python's call stack.
+    """
+    stack = [task]
+    value = None
+    while stack:
+        try:
+            subtask = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+        else:
+            stack.append(subtask)
+            value = None
+    return value
+
+
+def count_clauses(clauses, num_vars, cache):
+    """
+    Counts assignments to variables 1 to `num_vars` satisfying `clauses`.
+    Generator for use with `run`.
+    """
+    result = propagate(clauses, ())
+    if result is None:
+        return 0
+    residual, assigned = result
+    free = num_vars - len(assigned) - len(variables(residual))
+    count = 1 << free
+    for component in components(residual):
+        count *= yield count_component(component, cache)
+        if not count:
+            break
+    return count
+
+
+def count_component(clauses, cache):
+    """
+    Counts assignments to the variables of a connected, non-empty set of
+    `clauses` satisfying them. Generator for use with `run`.
+    """
+    key = frozenset(clauses)
+    if key in cache:
+        return cache[key]
+
+    # Branch on the variable occurring in the most clauses
+    occurrences = dict()
+    for clause in clauses:
+        for lit in clause:
+            occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + 1
+    var = max(occurrences, key=occurrences.get)
+
+    total = 0
+    for lit in (var, -var):
+        result = propagate(clauses, (lit,))
+        if result is None:
+            continue
+        residual, assigned = result
+        free = len(occurrences) - len(assigned) - len(variables(residual))
+        count = 1 << free
+        for component in components(residual):
+            count *= yield count_component(component, cache)
+            if not count:
+                break
+        total += count
+
+    cache[key] = total
+    return total
+
+
+def propagate(clauses, lits):
+    """
+    Assigns `lits` and then every literal of a unit clause, until none are
+    left. Returns the remaining clauses and the set of assigned variables,
+    or None if some clause becomes false.
+    """
+    if not all(clauses):
+        return None
+
+    # Clauses containing each literal, and how many of each clause's
+    # literals are not yet false
+    occurrences = dict()
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurrences.setdefault(lit, []).append(i)
+    size = [len(clause) for clause in clauses]
+    satisfied = [False] * len(clauses)
+
+    assigned = dict()
+    units = list(lits) + [clause[0] for clause in clauses if len(clause) == 1]
+    while units:
+        lit = units.pop()
+        if assigned.get(abs(lit)) == lit:
+            continue
+        if abs(lit) in assigned:
+            return None
+        assigned[abs(lit)] = lit
+
+        for i in occurrences.get(lit, ()):
+            satisfied[i] = True
+        for i in occurrences.get(-lit, ()):
+            if satisfied[i]:
+                continue
+            size[i] -= 1
+            if size[i] == 0:
+                return None
+            if size[i] == 1:
+                for other in clauses[i]:
+                    if abs(other) not in assigned:
+                        units.append(other)
+                        break
+
+    remaining = [
+        tuple(lit for lit in clause if abs(lit) not in assigned)
+        for i, clause in enumerate(clauses) if not satisfied[i]
+    ]
+    return remaining, set(assigned)
+
+
+def variables(clauses):
+    """Returns the set of variables occurring in `clauses`."""
+    return {abs(lit) for clause in clauses for lit in clause}
+
+
+def components(clauses):
+    """
+    Splits `clauses` into lists that share no variables with each other.
+    """
+    parent = dict()
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for clause in clauses:
+        for lit in clause:
+            parent.setdefault(abs(lit), abs(lit))
+        root = find(abs(clause[0]))
+        for lit in clause[1:]:
+            other = find(abs(lit))
+            if other != root:
+                parent[other] = root
+
+    groups = dict()
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+    return list(groups.values())
@@ -1,7 +1,33 @@
 import itertools
+import sys
+import weakref
 
 
 class Sentence():
+    """
+    Base class for logical sentences.
+
+    Sentences other than `And` are immutable and hash-consed: building a
+    sentence equal to one that is still alive returns the existing object,
+    so repeated subformulas are stored once. Each sentence caches its hash
+    and its set of symbols when it is built, unless it contains an `And`,
+    which can still grow. Such a sentence is mutable: it recomputes them
+    when asked after any `And` has grown.
+    """
+
+    __slots__ = ("_hash", "_symbols", "_mutable", "_generation", "__weakref__")
+
+    # Live interned sentences, keyed by class and identity of their parts
+    interned = weakref.WeakValueDictionary()
+
+    # Number of times an `And` has grown, which outdates the hash and
+    # symbols of every mutable sentence
+    generation = 0
+
+    def __hash__(self):
+        if self.outdated():
+            self.refresh()
+        return self._hash
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -12,8 +38,68 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        if self.outdated():
+            self.refresh()
+        return self._symbols
+
+    def outdated(self):
+        """
+        Returns True if the hash and symbols must be computed again. A
+        sentence not built with `remember` is treated as mutable.
+        """
+        return (getattr(self, "_mutable", True)
+                and getattr(self, "_generation", None) != Sentence.generation)
+
+    def compute_hash(self):
+        """Computes the hash of the sentence from its parts."""
+        raise Exception("nothing to hash")
+
+    def compute_symbols(self):
+        """Computes the symbols of the sentence from its parts."""
+        return frozenset()
+
+    @classmethod
+    def intern(cls, key):
+        """
+        Returns the live sentence of class `cls` with the given `key`, or
+        None if there is none.
+        """
+        return Sentence.interned.get((cls, key))
+
+    def remember(self, key, parts):
+        """
+        Interns the sentence under `key`, and caches its hash and symbols
+        unless one of its `parts` is mutable.
+        """
+        self._mutable = any(part._mutable for part in parts)
+        self._generation = None
+        if self._mutable:
+            self._hash = self._symbols = None
+        else:
+            self._hash = self.compute_hash()
+            self._symbols = self.compute_symbols()
+        Sentence.interned[type(self), key] = self
+
+    def refresh(self):
+        """
+        Recomputes the hash and symbols of a mutable sentence, and of the
+        outdated mutable sentences in it, without recursion.
+        """
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if not node.outdated():
+                stack.pop()
+                continue
+            pending = [part for part in parts(node) if part.outdated()]
+            if pending:
+                stack.extend(pending)
+            else:
+                stack.pop()
+                node._hash = node.compute_hash()
+                node._symbols = node.compute_symbols()
+                node._generation = Sentence.generation
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +130,25 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        self = cls.intern(name)
+        if self is None:
+            self = object.__new__(cls)
+            self.name = name
+            self.remember(name, ())
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return self.name
@@ -65,20 +162,36 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def compute_hash(self):
+        return hash(("symbol", self.name))
+
+    def compute_symbols(self):
+        return frozenset((self.name,))
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        key = id(operand)
+        self = cls.intern(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.operand = operand
+            self.remember(key, (operand,))
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,24 +202,42 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
+    def compute_hash(self):
+        return hash(("not", hash(self.operand)))
+
+    def compute_symbols(self):
         return self.operand.symbols()
 
 
 class And(Sentence):
+    """
+    Conjunction of sentences.
+
+    Unlike other sentences, a conjunction can grow with `add`, so it is
+    mutable and not interned.
+    """
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self._mutable = True
+        self._generation = None
+        self._hash = None
+        self._symbols = None
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -116,6 +247,7 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        Sentence.generation += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,24 +258,42 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def compute_hash(self):
+        return hash(
+            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        )
+
+    def compute_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        key = tuple(id(disjunct) for disjunct in disjuncts)
+        self = cls.intern(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.disjuncts = disjuncts
+            self.remember(key, disjuncts)
+        return self
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+    def __reduce__(self):
+        return (type(self), self.disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,24 +307,44 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def compute_hash(self):
+        return hash(
+            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        )
+
+    def compute_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        key = (id(antecedent), id(consequent))
+        self = cls.intern(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.antecedent = antecedent
+            self.consequent = consequent
+            self.remember(key, (antecedent, consequent))
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,76 +358,183 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def compute_hash(self):
+        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+
+    def compute_symbols(self):
+        return self.antecedent.symbols() | self.consequent.symbols()
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        key = (id(left), id(right))
+        self = cls.intern(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.left = left
+            self.right = right
+            self.remember(key, (left, right))
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
+    def compute_hash(self):
+        return hash(("biconditional", hash(self.left), hash(self.right)))
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def compute_symbols(self):
+        return self.left.symbols() | self.right.symbols()
+
+
+def evaluate(sentence, model):
+    """
+    Evaluates `sentence` in `model` using an explicit stack rather than
+    recursion, so arbitrarily deep sentences can be evaluated.
+    """
+    # Each entry is a sentence and how many of its parts are evaluated
+    stack = [(sentence, 0)]
+    push = stack.append
+    pop = stack.pop
+    value = None
+    while stack:
+        node, done = pop()
+        kind = type(node)
+        if kind is Symbol:
+            value = node.evaluate(model)
+        elif kind is And:
+            if done and not value:
+                continue
+            parts = node.conjuncts
+            if done == len(parts):
+                value = True
+            else:
+                push((node, done + 1))
+                push((parts[done], 0))
+        elif kind is Or:
+            if done and value:
+                continue
+            parts = node.disjuncts
+            if done == len(parts):
+                value = False
+            else:
+                push((node, done + 1))
+                push((parts[done], 0))
+        elif kind is Not:
+            if done:
+                value = not value
+            else:
+                push((node, 1))
+                push((node.operand, 0))
+        elif kind is Implication:
+            if done == 0:
+                push((node, 1))
+                push((node.antecedent, 0))
+            elif done == 1:
+                if value:
+                    push((node, 2))
+                    push((node.consequent, 0))
+                else:
+                    value = True
+        elif kind is Biconditional:
+            if done == 0:
+                push((node, 1))
+                push((node.left, 0))
+            elif done == 1:
+                push((node, 2 if value else 3))
+                push((node.right, 0))
+            elif done == 3:
+                value = not value
         else:
+            value = node.evaluate(model)
+    return bool(value)
+
+
+def parts(sentence):
+    """Returns the sentences that `sentence` is directly built from."""
+    if isinstance(sentence, Not):
+        return (sentence.operand,)
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return (sentence.antecedent, sentence.consequent)
+    if isinstance(sentence, Biconditional):
+        return (sentence.left, sentence.right)
+    return ()
+
+
+def depth(sentence):
+    """
+    Returns the nesting depth of `sentence` (1 for a symbol), computed
+    without recursion.
+    """
+    depths = dict()
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        if id(node) in depths:
+            stack.pop()
+            continue
+        pending = [part for part in parts(node) if id(part) not in depths]
+        if pending:
+            stack.extend(pending)
+        else:
+            stack.pop()
+            depths[id(node)] = 1 + max(
+                (depths[id(part)] for part in parts(node)), default=0
+            )
+    return depths[id(sentence)]
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    symbols = sorted(knowledge.symbols() | query.symbols())
+
+    # Recursive evaluation is faster, but only safe for shallow sentences
+    limit = sys.getrecursionlimit() // 4
+    if max(depth(knowledge), depth(query)) < limit:
+        def holds(sentence, model):
+            return sentence.evaluate(model)
+    else:
+        holds = evaluate
+
+    # Enumerate every model without recursion, in Gray code order so that
+    # each model differs from the previous one in a single symbol
+    model = dict.fromkeys(symbols, False)
+    for step in range(1 << len(symbols)):
+        if step:
+            flip = symbols[(step & -step).bit_length() - 1]
+            model[flip] = not model[flip]
+
+        # If knowledge base is true in model, then query must also be true
+        if holds(knowledge, model) and not holds(query, model):
+            return False
+    return True
@@ -1,4 +1,5 @@
 from logic import *
+from batch import ENTAILED, entailments
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -65,8 +66,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            answers = entailments(knowledge, symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if answers[symbol] == ENTAILED:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,503 @@
+import heapq
+
+from logic import *
+
+
+class CNF():
+    """
+    Conjunctive normal form of one or more logical sentences.
+
+    Symbols and subsentences are mapped to integer variables 1, 2, ...,
+    and a literal is a variable (true) or its negation (false). Compound
+    subsentences are named with fresh variables using the Tseitin encoding,
+    so the size of the CNF is linear in the size of the sentences. Each
+    fresh variable is defined to be equivalent to its subsentence, so
+    every model of the original sentences extends to exactly one model of
+    the CNF.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.variables = dict()
+        self.names = dict()
+        self.cache = dict()
+        self.true = None
+
+    def variable(self, name):
+        """Returns the variable representing the symbol called `name`."""
+        if name not in self.variables:
+            self.num_vars += 1
+            self.variables[name] = self.num_vars
+            self.names[self.num_vars] = name
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new auxiliary variable."""
+        self.num_vars += 1
+        return self.num_vars
+
+    def constant(self, value):
+        """Returns a literal that is always `value`."""
+        if self.true is None:
+            self.true = self.fresh()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """Adds clauses asserting that `sentence` is true."""
+        Sentence.validate(sentence)
+        stack = [sentence]
+        while stack:
+            sentence = stack.pop()
+            if isinstance(sentence, And):
+                stack.extend(reversed(sentence.conjuncts))
+            elif isinstance(sentence, Or):
+                self.clauses.append(
+                    [self.literal(disjunct) for disjunct in sentence.disjuncts]
+                )
+            elif isinstance(sentence, Implication):
+                self.clauses.append([-self.literal(sentence.antecedent),
+                                     self.literal(sentence.consequent)])
+            else:
+                self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when `sentence` is."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if sentence in self.cache:
+            return self.cache[sentence]
+
+        # Encode parts before the sentences built from them, without recursion
+        stack = [sentence]
+        while stack:
+            node = stack[-1]
+            if node in self.cache:
+                stack.pop()
+                continue
+            pending = [
+                part for part in parts(node)
+                if not isinstance(part, Symbol) and part not in self.cache
+            ]
+            if pending:
+                stack.extend(pending)
+            else:
+                stack.pop()
+                self.cache[node] = self.encode(node)
+        return self.cache[sentence]
+
+    def encode(self, sentence):
+        """
+        Returns a literal for `sentence`, whose parts are already encoded,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Not):
+            return -self.part(sentence.operand)
+        if isinstance(sentence, And):
+            lits = [self.part(c) for c in sentence.conjuncts]
+            return self.gate(lits, conjunction=True)
+        if isinstance(sentence, Or):
+            lits = [self.part(d) for d in sentence.disjuncts]
+            return self.gate(lits, conjunction=False)
+        if isinstance(sentence, Implication):
+            lits = [-self.part(sentence.antecedent),
+                    self.part(sentence.consequent)]
+            return self.gate(lits, conjunction=False)
+        if isinstance(sentence, Biconditional):
+            a = self.part(sentence.left)
+            b = self.part(sentence.right)
+            lit = self.fresh()
+            self.clauses.extend([
+                [-lit, -a, b], [-lit, a, -b],
+                [lit, a, b], [lit, -a, -b]
+            ])
+            return lit
+        raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+    def part(self, sentence):
+        """Returns the literal of an already encoded part of a sentence."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        return self.cache[sentence]
+
+    def gate(self, lits, conjunction):
+        """
+        Returns a literal equivalent to the conjunction (or disjunction)
+        of `lits`, defining a fresh variable if needed.
+        """
+        if not lits:
+            return self.constant(conjunction)
+        if len(lits) == 1:
+            return lits[0]
+
+        # A disjunction is the negation of a conjunction of negations
+        sign = 1 if conjunction else -1
+        lits = [sign * lit for lit in lits]
+        lit = self.fresh()
+        for l in lits:
+            self.clauses.append([-lit, l])
+        self.clauses.append([lit] + [-l for l in lits])
+        return sign * lit
+
+
+class Solver():
+    """
+    CDCL SAT solver over integer literals.
+
+    Uses two watched literals per clause for unit propagation, first-UIP
+    clause learning with non-chronological backjumping, VSIDS variable
+    activities, phase saving and Luby restarts. Clauses may be added
+    between calls to `solve`, and learned clauses are kept across calls,
+    so the solver can be used incrementally under different assumptions.
+    """
+
+    RESTART_BASE = 64
+    ACTIVITY_DECAY = 0.95
+
+    def __init__(self, num_vars=0):
+        self.num_vars = 0
+        self.clauses = []
+        self.learnts = []
+        self.watches = dict()
+        self.assigns = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.heap = []
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.ensure_vars(num_vars)
+
+    def ensure_vars(self, num_vars):
+        """Makes variables up to `num_vars` known to the solver."""
+        while self.num_vars < num_vars:
+            self.num_vars += 1
+            v = self.num_vars
+            self.watches[v] = []
+            self.watches[-v] = []
+            self.assigns.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(False)
+            heapq.heappush(self.heap, (0.0, v))
+
+    def value(self, lit):
+        """Returns 1 if `lit` is true, -1 if false, 0 if unassigned."""
+        return self.assigns[lit] if lit > 0 else -self.assigns[-lit]
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def add_clause(self, lits):
+        """
+        Adds a clause, given as an iterable of literals.
+        Returns False if the solver has become unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        clause = []
+        for lit in lits:
+            self.ensure_vars(abs(lit))
+            value = self.value(lit)
+            if value > 0 or -lit in clause:
+                return True
+            if value == 0 and lit not in clause:
+                clause.append(lit)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def enqueue(self, lit, reason):
+        v = abs(lit)
+        self.assigns[v] = 1 if lit > 0 else -1
+        self.level[v] = self.decision_level()
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """
+        Propagates all enqueued assignments.
+        Returns a conflicting clause, or None if there is no conflict.
+        """
+        watches = self.watches
+        assigns = self.assigns
+        trail = self.trail
+        while self.qhead < len(trail):
+            lit = trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            false_lit = -lit
+            watching = watches[false_lit]
+            kept = []
+            i = 0
+            n = len(watching)
+            while i < n:
+                clause = watching[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = assigns[first] if first > 0 else -assigns[-first]
+                if first_value > 0:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    if (assigns[other] if other > 0 else -assigns[-other]) >= 0:
+                        clause[1], clause[k] = other, false_lit
+                        watches[other].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value < 0:
+                        kept.extend(watching[i:])
+                        watches[false_lit] = kept
+                        self.qhead = len(trail)
+                        return clause
+                    self.enqueue(first, clause)
+            watches[false_lit] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a first-UIP learned clause from `conflict`.
+        Returns the clause, asserting literal first, and the level to
+        backjump to.
+        """
+        seen = set()
+        learnt = [None]
+        counter = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+        current = self.decision_level()
+        while True:
+            for q in clause:
+                if q == lit:
+                    continue
+                v = abs(q)
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.level[v] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(lit)]
+            counter -= 1
+            if counter == 0:
+                break
+            seen.discard(abs(lit))
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            for u in range(1, self.num_vars + 1):
+                self.activity[u] *= 1e-100
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u)
+                         for u in range(1, self.num_vars + 1)
+                         if not self.assigns[u]]
+            heapq.heapify(self.heap)
+        elif not self.assigns[v]:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def cancel_until(self, level):
+        """Undoes all assignments above decision level `level`."""
+        if self.decision_level() <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            v = abs(lit)
+            self.phase[v] = lit > 0
+            self.assigns[v] = 0
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = min(self.qhead, start)
+
+    def pick_branch(self):
+        """Returns the unassigned variable with highest activity, if any."""
+        heap = self.heap
+        while heap:
+            activity, v = heapq.heappop(heap)
+            if not self.assigns[v] and -activity == self.activity[v]:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Decides whether the clauses are satisfiable with every literal in
+        `assumptions` true. If so, stores a satisfying assignment in
+        `self.model` (a dict from variable to bool) and returns True.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        for lit in assumptions:
+            self.ensure_vars(abs(lit))
+
+        restarts = 0
+        budget = self.RESTART_BASE * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                budget -= 1
+                if self.decision_level() == 0:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.increment /= self.ACTIVITY_DECAY
+                continue
+
+            if budget <= 0:
+                restarts += 1
+                budget = self.RESTART_BASE * luby(restarts)
+                self.cancel_until(0)
+                continue
+
+            level = self.decision_level()
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self.value(lit)
+                if value < 0:
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.enqueue(lit, None)
+                continue
+
+            v = self.pick_branch()
+            if v is None:
+                self.model = {
+                    u: self.assigns[u] > 0
+                    for u in range(1, self.num_vars + 1)
+                }
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(v if self.phase[v] else -v, None)
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that answers queries incrementally.
+
+    Sentences are encoded into a single CNF as they are added, and one
+    solver is kept for the lifetime of the knowledge base, so learned
+    clauses and facts fixed by propagation carry over from one question to
+    the next. Queries may be asked under temporary assumptions, which are
+    passed to the solver rather than added as clauses and so are forgotten
+    after the query.
+    """
+
+    def __init__(self, *sentences):
+        self.knowledge = And()
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.loaded = 0
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds `sentence` to the knowledge base."""
+        self.knowledge.add(sentence)
+        self.cnf.add(sentence)
+        self.load()
+
+    def load(self):
+        """Passes clauses not yet seen by the solver to it."""
+        self.solver.ensure_vars(self.cnf.num_vars)
+        for clause in self.cnf.clauses[self.loaded:]:
+            self.solver.add_clause(clause)
+        self.loaded = len(self.cnf.clauses)
+
+    def satisfiable(self, *assumptions):
+        """
+        Checks if the knowledge base has a model in which every sentence in
+        `assumptions` is true.
+        """
+        lits = [self.cnf.literal(assumption) for assumption in assumptions]
+        self.load()
+        return self.solver.solve(lits)
+
+    def entails(self, query, *assumptions):
+        """
+        Checks if the knowledge base, together with `assumptions`, entails
+        `query`.
+        """
+        return not self.satisfiable(Not(query), *assumptions)
+
+
+def luby(i):
+    """Returns the `i`th element (from 0) of the Luby restart sequence."""
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power -= 1
+        i %= size
+    return 2 ** power
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing with a SAT solver
+    that knowledge ∧ ¬query has no model. Drop-in replacement for
+    `model_check`.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    goal = cnf.literal(query)
+    solver = Solver(cnf.num_vars)
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve([-goal])
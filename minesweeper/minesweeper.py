@@ -1,6 +1,8 @@
 import itertools
 import random
 
+from probability import mine_probabilities
+
 
 class Minesweeper():
     """
@@ -148,11 +150,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines on the board
         self.height = height
         self.width = width
+        self.mine_count = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -215,6 +218,9 @@ class MinesweeperAI():
                         and i + i_cell in range(self.height)
                         and j + j_cell in range(self.width)):
                     neighbors_cell.append((i + i_cell, j + j_cell))
+                elif (i + i_cell, j + j_cell) in self.mines:
+                    # Known mines are left out, so they leave the count too
+                    count -= 1
         new_sentence = Sentence(neighbors_cell, count)
         if len(neighbors_cell) != 0:
             self.knowledge.append(new_sentence)
@@ -276,9 +282,12 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        the cell least likely to be a mine, given the knowledge base and
+        the number of mines left, breaking ties randomly. Cells found to be
+        certainly mines are marked as mines.
         """
         possible_moves = set()
         for i in range(self.height):
@@ -287,5 +296,22 @@ class MinesweeperAI():
         possible_moves = possible_moves - self.moves_made - self.mines
         if len(possible_moves) == 0:
             return None
-        else:
+
+        inference = mine_probabilities(
+            [(sentence.cells, sentence.count) for sentence in self.knowledge],
+            possible_moves,
+            self.mine_count - len(self.mines)
+        )
+        if inference is None:
             return random.choice(list(possible_moves))
+
+        probabilities, mines = inference
+        for cell in mines:
+            self.mark_mine(cell)
+        possible_moves = possible_moves - self.mines
+        if len(possible_moves) == 0:
+            return None
+        lowest = min(probabilities[cell] for cell in possible_moves)
+        return random.choice([
+            cell for cell in possible_moves if probabilities[cell] == lowest
+        ])
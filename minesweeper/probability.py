@@ -0,0 +1,192 @@
+"""
+Mine probabilities for Minesweeper
+
+Unknown cells that appear in sentences (the frontier) split into independent
+components, where two cells share a component if a chain of overlapping
+sentences links them. The consistent mine placements of each component are
+counted by the number of mines they use, and the components are combined by
+weighting each total with the number of ways to place the remaining mines
+among the unknown cells off the frontier.
+
+Cells that belong to exactly the same sentences are interchangeable, so a
+component is enumerated over these groups of cells, choosing how many mines
+each group holds, rather than over single cells.
+"""
+
+import math
+
+
+def mine_probabilities(sentences, unknown, mines_left):
+    """
+    Returns a dict mapping every cell in `unknown` to the probability that it
+    is a mine, given `sentences` about those cells, as (cells, count) pairs,
+    and the number of mines among the unknown cells, along with the set of
+    cells that are certainly mines. Certainty is decided on the exact
+    counts, as a probability close to 1 may round to 1.0.
+
+    Returns None if no placement of the mines satisfies every sentence.
+    """
+    unknown = set(unknown)
+    constraints = list({
+        (frozenset(cells), count) for cells, count in sentences if cells
+    })
+
+    # Group the frontier cells by the sentences they belong to
+    signatures = dict()
+    for c, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            signatures.setdefault(cell, []).append(c)
+    groups = dict()
+    for cell, signature in signatures.items():
+        groups.setdefault(tuple(signature), []).append(cell)
+
+    # Count the placements of every component
+    components = []
+    for component in split_components(groups, len(constraints)):
+        counts, expected = count_placements(
+            [(len(groups[signature]), signature) for signature in component],
+            {c: constraints[c][1] for signature in component
+             for c in signature}
+        )
+        if not counts:
+            return None
+        components.append((component, counts, expected))
+
+    interior = len(unknown) - len(signatures)
+
+    def ways(frontier_mines):
+        """
+        Returns the number of ways to place the mines left off the frontier
+        when it holds `frontier_mines` mines.
+        """
+        rest = mines_left - frontier_mines
+        if rest < 0 or rest > interior:
+            return 0
+        return math.comb(interior, rest)
+
+    total = convolve([counts for _, counts, _ in components])
+    weight = sum(n * ways(k) for k, n in total.items())
+    if weight == 0:
+        return None
+
+    probabilities = dict()
+    mines = set()
+    for k, (component, counts, expected) in enumerate(components):
+        others = convolve([
+            other for m, (_, other, _) in enumerate(components) if m != k
+        ])
+
+        # Weight of the rest of the board for each mine count here
+        weights = {
+            count: sum(n * ways(count + rest) for rest, n in others.items())
+            for count in counts
+        }
+        for signature, by_mines in zip(component, expected):
+            cells = groups[signature]
+            share = sum(n * weights[count] for count, n in by_mines.items())
+            for cell in cells:
+                probabilities[cell] = share / (weight * len(cells))
+            if share == weight * len(cells):
+                mines.update(cells)
+
+    if interior:
+        share = sum(
+            n * ways(k) * (mines_left - k) for k, n in total.items()
+        )
+        for cell in unknown - signatures.keys():
+            probabilities[cell] = share / (weight * interior)
+        if share == weight * interior:
+            mines.update(unknown - signatures.keys())
+    return probabilities, mines
+
+
+def split_components(groups, size):
+    """
+    Returns the groups, by signature, split into lists that share no
+    sentence, each ordered so that neighbouring groups come close together.
+    `size` is the number of sentences.
+    """
+    by_constraint = [[] for _ in range(size)]
+    for signature in groups:
+        for c in signature:
+            by_constraint[c].append(signature)
+
+    components = []
+    seen = set()
+    for start in groups:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        for signature in component:
+            for c in signature:
+                for neighbor in by_constraint[c]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        component.append(neighbor)
+        components.append(component)
+    return components
+
+
+def count_placements(groups, counts):
+    """
+    Counts the mine placements in a component that satisfy its sentences.
+
+    `groups` is a list of (size, sentences) pairs and `counts` maps each
+    sentence to its number of mines. Returns a dict mapping each number of
+    mines to the number of placements using it, and, for each group, a dict
+    mapping each number of mines to the total mines the group holds over
+    those placements.
+    """
+    remaining = dict(counts)
+    unassigned = {c: 0 for c in counts}
+    for size, signature in groups:
+        for c in signature:
+            unassigned[c] += size
+
+    totals = dict()
+    expected = [dict() for _ in groups]
+    chosen = [0] * len(groups)
+
+    def place(g, mines, ways):
+        if g == len(groups):
+            totals[mines] = totals.get(mines, 0) + ways
+            for h, count in enumerate(chosen):
+                if count:
+                    expected[h][mines] = (
+                        expected[h].get(mines, 0) + ways * count
+                    )
+            return
+        size, signature = groups[g]
+        for c in signature:
+            unassigned[c] -= size
+        for count in range(size + 1):
+            if all(0 <= remaining[c] - count <= unassigned[c]
+                   for c in signature):
+                for c in signature:
+                    remaining[c] -= count
+                chosen[g] = count
+                place(g + 1, mines + count, ways * math.comb(size, count))
+                for c in signature:
+                    remaining[c] += count
+        chosen[g] = 0
+        for c in signature:
+            unassigned[c] += size
+
+    place(0, 0, 1)
+    return totals, expected
+
+
+def convolve(distributions):
+    """
+    Returns the distribution of the total mine count of independent
+    components, given each as a dict mapping mine count to placements.
+    """
+    total = {0: 1}
+    for distribution in distributions:
+        combined = dict()
+        for a, m in total.items():
+            for b, n in distribution.items():
+                combined[a + b] = combined.get(a + b, 0) + m * n
+        total = combined
+    return total
@@ -0,0 +1,72 @@
+"""
+Plays Minesweeper games with the AI and no window, reporting how many it
+wins and how long its random moves take.
+"""
+
+import argparse
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games with the AI and report its "
+                    "results. The defaults are an expert board."
+    )
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    wins = 0
+    guesses = 0
+    thinking = 0.0
+    slowest = 0.0
+    for _ in range(args.games):
+        won, game_guesses, game_thinking, game_slowest = play(
+            args.height, args.width, args.mines
+        )
+        wins += won
+        guesses += game_guesses
+        thinking += game_thinking
+        slowest = max(slowest, game_slowest)
+
+    print(f"Won {wins} of {args.games} games")
+    if guesses:
+        print(f"{guesses} random moves, {1000 * thinking / guesses:.1f} ms "
+              f"on average, {1000 * slowest:.1f} ms at most")
+
+
+def play(height, width, mines):
+    """
+    Plays one game. Returns whether the AI won, the number of random moves
+    it made, their total time and the time of the slowest.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    guesses = 0
+    thinking = 0.0
+    slowest = 0.0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            start = time.perf_counter()
+            move = ai.make_random_move()
+            elapsed = time.perf_counter() - start
+            guesses += 1
+            thinking += elapsed
+            slowest = max(slowest, elapsed)
+            if move is None:
+                return ai.mines == game.mines, guesses, thinking, slowest
+        if game.is_mine(move):
+            return False, guesses, thinking, slowest
+        ai.add_knowledge(move, game.nearby_mines(move))
+
+
+if __name__ == "__main__":
+    main()
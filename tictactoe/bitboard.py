@@ -0,0 +1,232 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A state is a pair of 9-bit integers (x, o) holding the squares taken by X
+and by O, where square (i, j) is bit 3 * i + j. The functions mirror those
+of tictactoe.py, and `from_board` and `to_board` convert to and from its
+list-of-lists boards.
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY, MOVE_ORDER, SYMMETRIES, probe, store
+
+# Every square taken
+FULL = (1 << 9) - 1
+
+# Bitmasks of the rows, columns and diagonals
+WIN_MASKS = (
+    [0b111 << (3 * i) for i in range(3)]
+    + [0b001001001 << j for j in range(3)]
+    + [0b100010001, 0b001010100]
+)
+
+# Whether a set of squares contains a line, for every set of squares
+WINNING = [
+    any(bits & mask == mask for mask in WIN_MASKS)
+    for bits in range(1 << 9)
+]
+
+# Bits of the squares, in the order the search tries them
+ORDERED_BITS = [(1 << (3 * i + j), (i, j)) for i, j in MOVE_ORDER]
+
+# For each rotation and reflection, the image of every set of squares
+SYMMETRY_TABLES = [
+    [
+        sum(1 << k for k, (i, j) in enumerate(symmetry)
+            if bits >> (3 * i + j) & 1)
+        for bits in range(1 << 9)
+    ]
+    for symmetry in SYMMETRIES
+]
+
+# Values of searched states, by canonical key, kept for the whole process
+transpositions = dict()
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the state of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board of a state.
+    """
+    x, o = state
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+
+def player(state):
+    """
+    Returns player who has the next turn in a state.
+    """
+    x, o = state
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(state):
+    """
+    Returns the list of possible actions (i, j) in a state, in search order.
+    """
+    taken = state[0] | state[1]
+    return [action for bit, action in ORDERED_BITS if not taken & bit]
+
+
+def result(state, action):
+    """
+    Returns the state that results from making move (i, j) in a state.
+    """
+    i, j = action
+    bit = 1 << (3 * i + j)
+    x, o = state
+    if (x | o) & bit:
+        raise ValueError("Illegal move")
+    if x.bit_count() == o.bit_count():
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return WINNING[x] or WINNING[o] or x | o == FULL
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def canonical_key(state):
+    """
+    Returns an integer that encodes the state, the same for all 8
+    rotations and reflections of it.
+    """
+    x, o = state
+    return min(table[x] | table[o] << 9 for table in SYMMETRY_TABLES)
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player in a state.
+    """
+    if terminal(state):
+        return None
+    alpha, beta = -1, 1
+    best_action = None
+    if player(state) == X:
+        for action in actions(state):
+            value = min_value(result(state, action), alpha, beta)
+            if best_action is None or value > alpha:
+                best_action, alpha = action, max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        for action in actions(state):
+            value = max_value(result(state, action), alpha, beta)
+            if best_action is None or value < beta:
+                best_action, beta = action, min(beta, value)
+            if alpha >= beta:
+                break
+    return best_action
+
+
+def minimax_board(board):
+    """
+    Returns the optimal action for the current player on a list-of-lists
+    board, as `tictactoe.minimax` does.
+    """
+    return minimax(from_board(board))
+
+
+def max_value(state, alpha=-1, beta=1):
+    """
+    Returns the value of the state for X to move, searching with
+    alpha-beta pruning and the transposition table.
+    """
+    if terminal(state):
+        return utility(state)
+    key = canonical_key(state)
+    value, alpha, beta = probe(transpositions, key, alpha, beta)
+    if value is not None:
+        return value
+    window = alpha, beta
+    x, o = state
+    taken = x | o
+    value = -math.inf
+    for bit, _ in ORDERED_BITS:
+        if not taken & bit:
+            value = max(value, min_value((x | bit, o), alpha, beta))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    store(transpositions, key, value, *window)
+    return value
+
+
+def min_value(state, alpha=-1, beta=1):
+    """
+    Returns the value of the state for O to move, searching with
+    alpha-beta pruning and the transposition table.
+    """
+    if terminal(state):
+        return utility(state)
+    key = canonical_key(state)
+    value, alpha, beta = probe(transpositions, key, alpha, beta)
+    if value is not None:
+        return value
+    window = alpha, beta
+    x, o = state
+    taken = x | o
+    value = math.inf
+    for bit, _ in ORDERED_BITS:
+        if not taken & bit:
+            value = min(value, max_value((x, o | bit), alpha, beta))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+    store(transpositions, key, value, *window)
+    return value
+
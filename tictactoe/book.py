@@ -0,0 +1,158 @@
+"""
+Tic Tac Toe opening book
+
+Every reachable board is solved once and its best move stored on disk, keyed
+by the board's canonical encoding, so that `minimax` answers from the book
+without searching.
+"""
+
+import argparse
+import os
+import struct
+
+import bitboard
+from tictactoe import SYMMETRIES
+
+# Default location of the book
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+
+# Each record is one little-endian integer holding the canonical key in
+# the high bits, then the value plus 1 in 4 bits and the move in 4 bits
+RECORD = struct.Struct("<I")
+
+# Book loaded by `get_book`, mapping canonical key to (value, move), where
+# the move is the square index 3 * i + j in the canonical orientation
+book = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve every reachable tic-tac-toe board and write the "
+                    "opening book used by book.minimax."
+    )
+    parser.add_argument("output", nargs="?", default=BOOK_FILE,
+                        help="book file to write")
+    args = parser.parse_args()
+
+    entries = solve()
+    write_book(entries, args.output)
+    size = os.path.getsize(args.output)
+    print(f"Wrote {len(entries)} positions ({size} bytes) to {args.output}")
+
+
+def canonical(state):
+    """
+    Returns the canonical key of a bitboard state and the index of the
+    symmetry in SYMMETRIES that maps the state onto it.
+    """
+    x, o = state
+    return min(
+        (table[x] | table[o] << 9, s)
+        for s, table in enumerate(bitboard.SYMMETRY_TABLES)
+    )
+
+
+def solve():
+    """
+    Returns a dict mapping the canonical key of every reachable non-terminal
+    board to its value and best move in the canonical orientation.
+
+    Among optimal moves, faster wins and slower losses are preferred, and
+    then moves earlier in the search order.
+    """
+    entries = dict()
+    scores = dict()
+
+    def score(key):
+        """
+        Returns the score of the canonical board `key`: its utility times
+        one more than the number of empty squares left when the game ends.
+        """
+        if key in scores:
+            return scores[key]
+        state = (key & bitboard.FULL, key >> 9)
+        if bitboard.terminal(state):
+            empty = 9 - (state[0] | state[1]).bit_count()
+            scores[key] = bitboard.utility(state) * (1 + empty)
+            return scores[key]
+
+        best = None
+        maximizing = bitboard.player(state) == bitboard.X
+        for action in bitboard.actions(state):
+            value = score(canonical(bitboard.result(state, action))[0])
+            if (best is None or maximizing and value > best
+                    or not maximizing and value < best):
+                best, move = value, 3 * action[0] + action[1]
+        scores[key] = best
+        entries[key] = ((best > 0) - (best < 0), move)
+        return best
+
+    score(canonical(bitboard.initial_state())[0])
+    return entries
+
+
+def write_book(entries, filename):
+    """
+    Writes the book `entries` to `filename`, one record per board.
+    """
+    with open(filename, "wb") as f:
+        for key in sorted(entries):
+            value, move = entries[key]
+            f.write(RECORD.pack(key << 8 | (value + 1) << 4 | move))
+
+
+def load_book(filename):
+    """
+    Returns the book entries stored in `filename`.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    return {
+        record >> 8: ((record >> 4 & 0xF) - 1, record & 0xF)
+        for record, in RECORD.iter_unpack(data)
+    }
+
+
+def get_book(filename=BOOK_FILE):
+    """
+    Returns the book, loading it on first use. A missing book is solved
+    and, if the directory is writable, saved for next time.
+    """
+    global book
+    if book is None:
+        if os.path.exists(filename):
+            book = load_book(filename)
+        else:
+            book = solve()
+            try:
+                write_book(book, filename)
+            except OSError:
+                pass
+    return book
+
+
+def lookup(board):
+    """
+    Returns the value of a list-of-lists board and the optimal action for
+    the current player, or None if the board is not in the book.
+    """
+    key, s = canonical(bitboard.from_board(board))
+    entry = get_book().get(key)
+    if entry is None:
+        return None
+    value, move = entry
+    return value, SYMMETRIES[s][move]
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board, from
+    the book. Returns None if the game is over.
+    """
+    entry = lookup(board)
+    return None if entry is None else entry[1]
+
+
+if __name__ == "__main__":
+    main()
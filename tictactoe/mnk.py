@@ -0,0 +1,425 @@
+"""
+m,n,k-game Player
+
+Players take turns on a board `width` squares wide and `height` squares
+high, and the first to get `k` in a row across, down or diagonally wins.
+Tic-tac-toe is the 3,3,3-game. Boards are too large to search to the end,
+so the search deepens iteratively within a time budget and scores the
+positions it stops at with a heuristic evaluation.
+"""
+
+import argparse
+import math
+import random
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, less the number of moves it takes to win
+WIN = 1_000_000
+
+# Scores within this distance of WIN are wins rather than evaluations
+WIN_MARGIN = 10_000
+
+# Kinds of values stored in the transposition table
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+
+class Timeout(Exception):
+    """Raised to abandon a search that ran out of time."""
+
+
+class Board():
+    """
+    An m,n,k-game position that is changed in place by `play` and `undo`.
+
+    Every run of `k` squares in a line is a window. The board keeps how
+    many X and O stones each window holds, so a move only updates the
+    windows through its square: that detects a win, and keeps the
+    heuristic score from X's side, the sum over windows holding stones of
+    only one player of a weight that grows with their number, up to date.
+    Squares are numbered row by row, and `hash` is a Zobrist hash.
+    """
+
+    def __init__(self, width=3, height=3, k=3):
+        if k > max(width, height):
+            raise ValueError("nobody can get k in a row on this board")
+        self.width = width
+        self.height = height
+        self.k = k
+        self.cells = [EMPTY] * (width * height)
+        self.moves = []
+        self.won = None
+        self.score = 0
+        self.hash = 0
+
+        # Windows as tuples of squares, and the windows through each square
+        self.windows = []
+        for i in range(height):
+            for j in range(width):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < height and 0 <= end_j < width:
+                        self.windows.append(tuple(
+                            (i + di * t) * width + j + dj * t
+                            for t in range(k)
+                        ))
+        self.square_windows = [[] for _ in self.cells]
+        for w, window in enumerate(self.windows):
+            for square in window:
+                self.square_windows[square].append(w)
+        self.x_counts = [0] * len(self.windows)
+        self.o_counts = [0] * len(self.windows)
+
+        # Score of a window by its X and O counts, from X's side
+        weights = [0] + [4 ** c for c in range(k - 1)] + [WIN]
+        self.window_score = [
+            [weights[x] if not o else -weights[o] if not x else 0
+             for o in range(k + 1)]
+            for x in range(k + 1)
+        ]
+
+        # Random keys of each player's stone on each square
+        rng = random.Random(width * 10000 + height * 100 + k)
+        self.keys = {
+            player: [rng.getrandbits(64) for _ in self.cells]
+            for player in (X, O)
+        }
+
+    def player(self):
+        """Returns player who has the next turn."""
+        return X if len(self.moves) % 2 == 0 else O
+
+    def terminal(self):
+        """Returns True if game is over, False otherwise."""
+        return self.won is not None or len(self.moves) == len(self.cells)
+
+    def winner(self):
+        """Returns the winner of the game, if there is one."""
+        return self.won
+
+    def actions(self):
+        """Returns the list of empty squares."""
+        return [s for s, cell in enumerate(self.cells) if cell is EMPTY]
+
+    def play(self, square):
+        """
+        Puts the current player's stone on `square`, updating the windows
+        through it.
+        """
+        if self.cells[square] is not EMPTY or self.won is not None:
+            raise ValueError("Illegal move")
+        player = self.player()
+        counts = self.x_counts if player == X else self.o_counts
+        x_counts, o_counts = self.x_counts, self.o_counts
+        for w in self.square_windows[square]:
+            self.score -= self.window_score[x_counts[w]][o_counts[w]]
+            counts[w] += 1
+            self.score += self.window_score[x_counts[w]][o_counts[w]]
+            if counts[w] == self.k:
+                self.won = player
+        self.cells[square] = player
+        self.moves.append(square)
+        self.hash ^= self.keys[player][square]
+
+    def undo(self):
+        """Takes back the last move."""
+        square = self.moves.pop()
+        player = self.cells[square]
+        counts = self.x_counts if player == X else self.o_counts
+        x_counts, o_counts = self.x_counts, self.o_counts
+        for w in self.square_windows[square]:
+            self.score -= self.window_score[x_counts[w]][o_counts[w]]
+            counts[w] -= 1
+            self.score += self.window_score[x_counts[w]][o_counts[w]]
+        self.cells[square] = EMPTY
+        self.won = None
+        self.hash ^= self.keys[player][square]
+
+    def evaluate(self):
+        """Returns the heuristic score from the side of the player to move."""
+        return self.score if self.player() == X else -self.score
+
+    def priority(self, square):
+        """
+        Returns how much playing `square` would add to either player's
+        windows, which ranks wins and blocks first.
+        """
+        total = 0
+        x_counts, o_counts = self.x_counts, self.o_counts
+        for w in self.square_windows[square]:
+            x, o = x_counts[w], o_counts[w]
+            if not o:
+                total += 4 ** x if x < self.k - 1 else WIN
+            if not x:
+                total += 4 ** o if o < self.k - 1 else WIN
+        return total
+
+    def candidates(self, radius=1):
+        """
+        Returns the empty squares within `radius` squares of a stone, or
+        the center square of an empty board. If none are that close, every
+        empty square is a candidate.
+        """
+        if not self.moves:
+            return [(self.height // 2) * self.width + self.width // 2]
+        near = set()
+        for square in self.moves:
+            i, j = divmod(square, self.width)
+            for ni in range(max(i - radius, 0),
+                            min(i + radius + 1, self.height)):
+                for nj in range(max(j - radius, 0),
+                                min(j + radius + 1, self.width)):
+                    if self.cells[ni * self.width + nj] is EMPTY:
+                        near.add(ni * self.width + nj)
+        return sorted(near) or self.actions()
+
+    def to_board(self):
+        """Returns the list-of-lists board of the position."""
+        return [self.cells[i * self.width:(i + 1) * self.width]
+                for i in range(self.height)]
+
+    def __str__(self):
+        return "\n".join(
+            " ".join(cell or "." for cell in row) for row in self.to_board()
+        )
+
+
+class Search():
+    """
+    Iterative-deepening alpha-beta (negamax) search with a time budget.
+
+    Each iteration searches one move deeper than the last, trying first
+    the best move found so far for every position, kept in a transposition
+    table keyed by Zobrist hash. Once `budget` seconds have passed, the
+    running iteration is abandoned and the best move of the last complete
+    one is played. Only moves within `radius` squares of a stone are
+    searched. With an `aspiration` width, each iteration first searches a
+    window that wide around the previous score. After each search, `depth`,
+    `nodes`, `score` and `elapsed` describe it, `results` holds the score
+    and move of every complete iteration, and `finished` is True if the
+    search stopped because it had searched deep enough rather than because
+    its time ran out.
+    """
+
+    # Nodes between checks of the clock
+    CHECK_INTERVAL = 512
+
+    def __init__(self, budget=1.0, max_depth=None, table=None, radius=1,
+                 aspiration=None):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.radius = radius
+        self.aspiration = aspiration
+        self.table = dict() if table is None else table
+        self.deadline = None
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.elapsed = 0.0
+        self.results = []
+        self.finished = False
+
+    def best_move(self, board, moves=None):
+        """
+        Returns the best square for the player to move on `board`, or None
+        if the game is over. If `moves` is given, only those squares are
+        considered at the root.
+        """
+        if board.terminal():
+            return None
+        start = time.perf_counter()
+        self.deadline = None
+        self.nodes = 0
+        self.results = []
+        self.finished = True
+        empty = len(board.cells) - len(board.moves)
+        max_depth = empty if self.max_depth is None else min(
+            self.max_depth, empty
+        )
+
+        move = None
+        for depth in range(1, max_depth + 1):
+            try:
+                self.score, move = self.aspirate(board, depth, moves, move)
+            except Timeout:
+                self.finished = False
+                break
+            self.depth = depth
+            self.results.append((self.score, move))
+            # The first iteration always completes
+            self.deadline = start + self.budget
+            if abs(self.score) >= WIN - WIN_MARGIN:
+                break
+        self.elapsed = time.perf_counter() - start
+        return move
+
+    def aspirate(self, board, depth, moves=None, first=None):
+        """
+        Searches the root to `depth` within the aspiration window around
+        the score of the previous iteration, searching again with a full
+        window if the score falls outside it.
+        """
+        if self.aspiration is None or first is None:
+            return self.root(board, depth, moves=moves, first=first)
+        alpha = self.score - self.aspiration
+        beta = self.score + self.aspiration
+        score, move = self.root(board, depth, alpha, beta, moves, first)
+        if alpha < score < beta:
+            return score, move
+        return self.root(board, depth, moves=moves, first=first)
+
+    def root(self, board, depth, alpha=-math.inf, beta=math.inf, moves=None,
+             first=None):
+        """
+        Searches the root moves, or only `moves`, to `depth` and returns
+        the best score and move, trying `first` (or the move stored for the
+        root) first.
+        """
+        if first is None:
+            entry = self.table.get(board.hash)
+            first = entry and entry[3]
+        squares = self.ordered(board, first)
+        if moves is not None:
+            squares = [square for square in squares if square in moves]
+            squares.extend(square for square in moves
+                           if square not in squares)
+        window = alpha
+        best_score, best_move = -math.inf, None
+        for square in squares:
+            board.play(square)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                board.undo()
+            if score > best_score:
+                best_score, best_move = score, square
+                alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        # Only a full search of every move settles the root's best move
+        if moves is None and window < best_score < beta:
+            self.table[board.hash] = (depth, best_score, EXACT, best_move)
+        return best_score, best_move
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        """
+        Returns the score of `board` for the player to move, searching
+        `depth` more moves. Scores outside (alpha, beta) are only bounds.
+        """
+        self.nodes += 1
+        if (self.deadline is not None
+                and self.nodes % self.CHECK_INTERVAL == 0
+                and time.perf_counter() > self.deadline):
+            raise Timeout
+        if board.won is not None:
+            return -(WIN - ply)
+        if len(board.moves) == len(board.cells):
+            return 0
+        if depth == 0:
+            return board.evaluate()
+
+        entry = self.table.get(board.hash)
+        best_move = None
+        if entry is not None:
+            stored_depth, value, kind, best_move = entry
+            if stored_depth >= depth:
+                value = from_table(value, ply)
+                if kind == EXACT:
+                    return value
+                if kind == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        window = alpha
+        best_score = -math.inf
+        for square in self.ordered(board, best_move):
+            board.play(square)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha,
+                                      ply + 1)
+            finally:
+                board.undo()
+            if score > best_score:
+                best_score, best_move = score, square
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        if best_score <= window:
+            kind = UPPER
+        elif best_score >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table[board.hash] = (depth, to_table(best_score, ply), kind,
+                                  best_move)
+        return best_score
+
+    def ordered(self, board, first=None):
+        """
+        Returns the candidate moves of `board`, `first` first and then by
+        priority.
+        """
+        squares = sorted(board.candidates(self.radius), key=board.priority,
+                         reverse=True)
+        if first is not None and first in squares:
+            squares.remove(first)
+            squares.insert(0, first)
+        return squares
+
+
+def to_table(score, ply):
+    """
+    Returns `score` as stored in the transposition table, with wins counted
+    from the stored position rather than the root.
+    """
+    if score >= WIN - WIN_MARGIN:
+        return score + ply
+    if score <= -(WIN - WIN_MARGIN):
+        return score - ply
+    return score
+
+
+def from_table(score, ply):
+    """Returns a score read from the transposition table at `ply`."""
+    if score >= WIN - WIN_MARGIN:
+        return score - ply
+    if score <= -(WIN - WIN_MARGIN):
+        return score + ply
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Let the computer play an m,n,k-game against itself."
+    )
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per move")
+    args = parser.parse_args()
+
+    board = Board(args.width, args.height, args.k)
+    search = Search(args.budget)
+    while not board.terminal():
+        square = search.best_move(board)
+        player = board.player()
+        board.play(square)
+        i, j = divmod(square, board.width)
+        print(f"{player} plays ({i}, {j}): depth {search.depth}, "
+              f"{search.nodes} nodes in {search.elapsed:.2f}s, "
+              f"score {search.score}")
+    print(board)
+    winner = board.winner()
+    print("Tie." if winner is None else f"{winner} wins.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Parallel m,n,k-game Player
+
+The root moves are split among a pool of worker processes, each searching
+its share with its own iterative-deepening search and transposition table.
+After every move the workers send back the table entries near the root,
+which are merged and handed to every worker with the next search.
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from mnk import Board, Search
+
+# Width of the aspiration window the workers search around the last score
+ASPIRATION = 50
+
+# Search and board dimensions of a worker process
+worker = dict()
+
+
+class ParallelSearch():
+    """
+    Root-split search of m,n,k-game positions over a process pool.
+
+    Workers finish different depths within the time budget, and scores from
+    different depths are not comparable, so the move is chosen among the
+    workers' results at the deepest depth that all of them completed.
+
+    After each search, `score`, `depth` (the depth the move was chosen at),
+    `nodes` and `elapsed` describe it, and `reports` holds one dict per
+    task with its moves, depth, nodes, time and nodes per second. Call
+    `close` when done, or use the search as a context manager.
+    """
+
+    def __init__(self, budget=1.0, processes=None, max_depth=None, radius=1,
+                 aspiration=ASPIRATION):
+        self.budget = budget
+        self.processes = processes or os.cpu_count() or 1
+        self.max_depth = max_depth
+        self.radius = radius
+        self.aspiration = aspiration
+        self.pool = multiprocessing.Pool(self.processes)
+        self.shared = dict()
+        self.score = 0
+        self.depth = 0
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.reports = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the worker processes."""
+        self.pool.terminate()
+        self.pool.join()
+
+    def best_move(self, board):
+        """
+        Returns the best square for the player to move on `board`, or None
+        if the game is over.
+        """
+        if board.terminal():
+            return None
+        start = time.perf_counter()
+
+        # Deal the ordered root moves out in turn, so that every worker
+        # gets some of the promising ones
+        squares = Search(radius=self.radius).ordered(board)
+        groups = [squares[k::self.processes] for k in range(self.processes)]
+        settings = (self.budget, self.max_depth, self.radius, self.aspiration)
+        dimensions = (board.width, board.height, board.k)
+        tasks = [
+            (dimensions, list(board.moves), group, settings, self.shared)
+            for group in groups if group
+        ]
+
+        outcomes = []
+        self.shared = dict()
+        self.reports = []
+        for results, finished, report, entries in self.pool.imap_unordered(
+                search_moves, tasks):
+            outcomes.append((results, finished))
+            self.reports.append(report)
+            for key, entry in entries.items():
+                if key not in self.shared or entry[0] > self.shared[key][0]:
+                    self.shared[key] = entry
+
+        # A worker that finished its search has its last result at every
+        # greater depth, so only the ones that ran out of time limit it
+        self.depth = min(
+            (len(results) for results, finished in outcomes if not finished),
+            default=max(len(results) for results, _ in outcomes)
+        )
+        self.score, best_move = max(
+            (results[min(self.depth, len(results)) - 1]
+             for results, _ in outcomes),
+            key=lambda result: result[0]
+        )
+        self.nodes = sum(report["nodes"] for report in self.reports)
+        self.elapsed = time.perf_counter() - start
+        return best_move
+
+
+def search_moves(task):
+    """
+    Searches some root moves of a position in a worker process. `task`
+    holds the board dimensions, the moves played so far, the root squares
+    to search, the search settings and the table entries shared by the
+    other workers. Returns the best score and move of every complete
+    iteration, whether the search finished before its time ran out, a
+    report on the search and the worker's table entries for the positions
+    within two moves of the root.
+    """
+    dimensions, moves, squares, settings, shared = task
+    budget, max_depth, radius, aspiration = settings
+
+    # Keep the worker's search, and its table, from one task to the next
+    if worker.get("dimensions") != dimensions:
+        worker["dimensions"] = dimensions
+        worker["search"] = Search(radius=radius)
+    search = worker["search"]
+    search.budget, search.max_depth = budget, max_depth
+    search.radius, search.aspiration = radius, aspiration
+    for key, entry in shared.items():
+        if key not in search.table or entry[0] > search.table[key][0]:
+            search.table[key] = entry
+
+    board = Board(*dimensions)
+    for square in moves:
+        board.play(square)
+    search.best_move(board, squares)
+    report = {
+        "moves": squares,
+        "depth": search.depth,
+        "nodes": search.nodes,
+        "time": search.elapsed,
+        "rate": search.nodes / search.elapsed if search.elapsed else 0.0,
+    }
+    return (search.results, search.finished, report,
+            near_entries(search, board))
+
+
+def near_entries(search, board):
+    """
+    Returns the table entries of `search` for the positions reachable from
+    `board` within two moves.
+    """
+    entries = dict()
+    for first in board.candidates(search.radius):
+        board.play(first)
+        if board.hash in search.table:
+            entries[board.hash] = search.table[board.hash]
+        if not board.terminal():
+            for second in board.candidates(search.radius):
+                board.play(second)
+                if board.hash in search.table:
+                    entries[board.hash] = search.table[board.hash]
+                board.undo()
+        board.undo()
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare parallel and sequential m,n,k-game search to a "
+                    "fixed depth."
+    )
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--moves", type=int, default=6,
+                        help="moves played by a quick search before timing")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    # Reach a middle-game position
+    board = Board(args.width, args.height, args.k)
+    opening = Search(budget=0.05)
+    for _ in range(args.moves):
+        if board.terminal():
+            break
+        board.play(opening.best_move(board))
+    print(board)
+
+    sequential = Search(budget=float("inf"), max_depth=args.depth)
+    move = sequential.best_move(board)
+    print(f"sequential: move {move}, score {sequential.score}, "
+          f"{sequential.nodes} nodes in {sequential.elapsed:.2f}s "
+          f"({sequential.nodes / sequential.elapsed:.0f} nodes/s)")
+
+    with ParallelSearch(budget=float("inf"), processes=args.processes,
+                        max_depth=args.depth) as parallel:
+        move = parallel.best_move(board)
+        for k, report in enumerate(parallel.reports):
+            print(f"task {k}: {len(report['moves'])} moves, depth "
+                  f"{report['depth']}, {report['nodes']} nodes in "
+                  f"{report['time']:.2f}s ({report['rate']:.0f} nodes/s)")
+        print(f"parallel: move {move}, score {parallel.score}, "
+              f"{parallel.nodes} nodes in {parallel.elapsed:.2f}s "
+              f"({parallel.nodes / parallel.elapsed:.0f} nodes/s)")
+    print(f"speedup: {sequential.elapsed / parallel.elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,44 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# Squares in the order the search tries them: center, corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as the list
+    of squares that land on squares (0, 0), (0, 1), ..., (2, 2).
+    """
+    result = []
+    for square in [lambda i, j: (i, j), lambda i, j: (j, i)]:
+        for turn in [lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+                     lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i)]:
+            result.append([
+                square(*turn(i, j)) for i in range(3) for j in range(3)
+            ])
+    return result
+
+
+# The 8 rotations and reflections of the board
+SYMMETRIES = symmetries()
+
+# Digits of the squares in the base-3 encoding of a board
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# Kinds of values stored in the transposition table
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Values of searched boards, by canonical key, kept for the whole process
+# so that later moves of a game reuse the work of earlier ones
+transpositions = dict()
+
+# Number of boards searched by max_value and min_value so far
+nodes = 0
+
 
 def initial_state():
     """
@@ -101,49 +139,133 @@ def utility(board):
         return 0
 
 
+def canonical_key(board):
+    """
+    Returns an integer that encodes the board, the same for all 8
+    rotations and reflections of it: the smallest base-3 encoding of any of
+    them.
+    """
+    return min(
+        sum(DIGITS[board[i][j]] * 3 ** k for k, (i, j) in enumerate(symmetry))
+        for symmetry in SYMMETRIES
+    )
+
+
+def probe(table, key, alpha, beta):
+    """
+    Looks up the board with canonical `key` in the transposition `table`.
+    Returns its value if it decides the search within (alpha, beta), and
+    otherwise None and the window narrowed by any stored bound.
+    """
+    entry = table.get(key)
+    if entry is not None:
+        value, kind = entry
+        if kind == EXACT:
+            return value, alpha, beta
+        if kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value, alpha, beta
+    return None, alpha, beta
+
+
+def store(table, key, value, alpha, beta):
+    """
+    Stores in the transposition `table` the value of the board with
+    canonical `key`, found by a search within (alpha, beta), and whether it
+    is exact or only a bound.
+    """
+    if value <= alpha:
+        table[key] = (value, UPPER)
+    elif value >= beta:
+        table[key] = (value, LOWER)
+    else:
+        table[key] = (value, EXACT)
+
+
+def ordered_actions(board):
+    """
+    Returns the possible actions on the board, center first, then corners,
+    then edges, so that strong moves are searched before weak ones.
+    """
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] is EMPTY]
+
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
     if terminal(board):
         return None
-    if player(board) == O:
-        action_value = {}
-        for action in actions(board):
-            value = max_value(result(board, action))
-            action_value[action] = value
-        for k, v in action_value.items():
-            if v == min(action_value.values()):
-                return k
+
+    # Search with an alpha-beta window over the possible utilities, keeping
+    # the first action whose value beats every earlier one
+    alpha, beta = -1, 1
+    best_action = None
     if player(board) == X:
-        action_value = {}
-        for action in actions(board):
-            value = min_value(result(board, action))
-            action_value[action] = value
-        for k, v in action_value.items():
-            if v == max(action_value.values()):
-                return k
+        for action in ordered_actions(board):
+            value = min_value(result(board, action), alpha, beta)
+            if best_action is None or value > alpha:
+                best_action, alpha = action, max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        for action in ordered_actions(board):
+            value = max_value(result(board, action), alpha, beta)
+            if best_action is None or value < beta:
+                best_action, beta = action, min(beta, value)
+            if alpha >= beta:
+                break
+    return best_action
 
 
-def max_value(board):
+def max_value(board, alpha=-1, beta=1):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the value of the board for X to move, searching with
+    alpha-beta pruning and the transposition table. Values outside
+    (alpha, beta) are only bounds.
     """
+    global nodes
+    nodes += 1
     if terminal(board):
         return utility(board)
+    key = canonical_key(board)
+    value, alpha, beta = probe(transpositions, key, alpha, beta)
+    if value is not None:
+        return value
+    window = alpha, beta
     value = -math.inf
-    for action in actions(board):
-        value = max(value, min_value(result(board, action)))
+    for action in ordered_actions(board):
+        value = max(value, min_value(result(board, action), alpha, beta))
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+    store(transpositions, key, value, *window)
     return value
 
 
-def min_value(board):
+def min_value(board, alpha=-1, beta=1):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the value of the board for O to move, searching with
+    alpha-beta pruning and the transposition table. Values outside
+    (alpha, beta) are only bounds.
     """
+    global nodes
+    nodes += 1
     if terminal(board):
         return utility(board)
+    key = canonical_key(board)
+    value, alpha, beta = probe(transpositions, key, alpha, beta)
+    if value is not None:
+        return value
+    window = alpha, beta
     value = math.inf
-    for action in actions(board):
-        value = min(value, max_value(result(board, action)))
+    for action in ordered_actions(board):
+        value = min(value, max_value(result(board, action), alpha, beta))
+        beta = min(beta, value)
+        if alpha >= beta:
+            break
+    store(transpositions, key, value, *window)
     return value
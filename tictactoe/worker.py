@@ -0,0 +1,108 @@
+"""
+Background Tic Tac Toe Player
+
+Moves are computed by `tictactoe.minimax` in a separate process, so that
+the game window keeps drawing while the computer thinks.
+"""
+
+import multiprocessing
+import time
+
+import tictactoe as ttt
+
+
+class MoveWorker():
+    """
+    A worker process that computes moves on request.
+
+    The process lives across requests, so its transposition table is shared
+    by all moves of a game. A reply is held back until `delay` seconds after
+    its request, so that the computer does not answer instantly.
+    """
+
+    def __init__(self, delay=0.5):
+        self.delay = delay
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.connection = None
+        self.requested = None
+        self.reply = None
+
+    def start(self):
+        """Starts the worker process."""
+        connection, child = self.context.Pipe()
+        self.process = self.context.Process(
+            target=serve, args=(child,), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.connection = connection
+
+    def request(self, board):
+        """Asks for the move to play on `board`."""
+        if self.process is None:
+            self.start()
+        self.connection.send(board)
+        self.requested = time.perf_counter()
+        self.reply = None
+
+    def busy(self):
+        """Returns True if a move was requested and not yet collected."""
+        return self.requested is not None
+
+    def thinking_time(self):
+        """Returns the seconds since the pending request, or 0."""
+        if self.requested is None:
+            return 0.0
+        return time.perf_counter() - self.requested
+
+    def poll(self):
+        """
+        Returns the move, the number of boards searched and the search time
+        once the requested move is ready, and None until then.
+        """
+        if self.requested is None:
+            return None
+        if self.reply is None and self.connection.poll():
+            self.reply = self.connection.recv()
+        if self.reply is None or self.thinking_time() < self.delay:
+            return None
+        reply, self.reply, self.requested = self.reply, None, None
+        return reply
+
+    def cancel(self):
+        """
+        Abandons the pending request. A search still running is stopped
+        along with the worker process, which restarts on the next request.
+        """
+        if self.requested is not None and self.reply is None:
+            self.close()
+        self.requested = None
+        self.reply = None
+
+    def close(self):
+        """Stops the worker process."""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.connection.close()
+        self.process = None
+        self.connection = None
+
+
+def serve(connection):
+    """
+    Answers each board received over `connection` with the optimal move,
+    the number of boards searched and the search time, until the other end
+    closes.
+    """
+    while True:
+        try:
+            board = connection.recv()
+        except EOFError:
+            return
+        nodes = ttt.nodes
+        start = time.perf_counter()
+        move = ttt.minimax(board)
+        elapsed = time.perf_counter() - start
+        connection.send((move, ttt.nodes - nodes, elapsed))